@@ -1,6 +1,9 @@
 from django.contrib import admin
 from .models import *
 from django import forms
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from .pagination import EstimatedCountPaginator
 # Register your models here.
 
 @admin.register(Car)
@@ -9,6 +12,7 @@ class CarAdmin(admin.ModelAdmin):
 @admin.register(ImgCarExtra)
 class ImgCarExtraAdmin(admin.ModelAdmin):
     list_display = ("name", "car")
+    list_select_related = ("car",)
 @admin.register(Destination)
 class DestinationAdmin(admin.ModelAdmin):
     list_display = ("name",)
@@ -82,9 +86,39 @@ class ReservationAdmin(admin.ModelAdmin):
         "status",
     )
 
-    
+    list_select_related = ("car",)
     list_filter = ("status", "car")
+    date_hierarchy = "pickup_datetime"
+    # substring search; trigram indexes back it on PostgreSQL (migration 0013)
     search_fields = ("name_surname", "email")
+    actions = ("approve_selected", "reject_selected")
+
+    # no COUNT(*) for the "N total" link; estimated count when unfiltered
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def change_status(self, request, queryset, transition, label):
+        # one at a time, so each approval re-checks overlap under the car lock
+        changed, errors = 0, []
+        for reservation in queryset.select_related("car"):
+            try:
+                transition(reservation)
+            except ValidationError as exc:
+                errors.append(f"#{reservation.pk}: {' '.join(exc.messages)}")
+            else:
+                changed += 1
+
+        self.message_user(request, f"{changed} reservation(s) {label}.")
+        if errors:
+            self.message_user(request, f"Not {label} – " + "; ".join(errors), messages.WARNING)
+
+    @admin.action(description="Approve selected reservations")
+    def approve_selected(self, request, queryset):
+        self.change_status(request, queryset, Reservation.approve, "approved")
+
+    @admin.action(description="Reject selected reservations")
+    def reject_selected(self, request, queryset):
+        self.change_status(request, queryset, Reservation.reject, "rejected")
 
 
 @admin.register(CarExtra)
@@ -93,4 +127,12 @@ class CarExtraAdmin(admin.ModelAdmin):
 
 @admin.register(CarPricePeriod)
 class CarPricePeriodAdmin(admin.ModelAdmin):
-    list_display = ("car", "price_per_day")
\ No newline at end of file
+    list_display = ("car", "price_per_day")
+    list_select_related = ("car",)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "sent_at", "last_error")
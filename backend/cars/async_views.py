@@ -0,0 +1,159 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.views import View
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import catalog, extras, routers
+from .availability import approved_overlapping
+from .models import Car, Destination
+from .serializers import CarAvailabilitySerializer
+
+
+# ---------------- HELPERS ----------------
+# Native async counterparts of the read-only catalog endpoints, served under
+# /api/async/. Their JSON is byte-for-byte what the DRF views return; the
+# DRF views stay the reference implementation and handle all writes.
+def json_response(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type="application/json")
+
+
+async def paginate(request, rows):
+    """PageNumberPagination's output for a queryset or list of rows."""
+    page_size = api_settings.PAGE_SIZE
+    count = await rows.acount() if isinstance(rows, QuerySet) else len(rows)
+    pages = max(1, -(-count // page_size))
+
+    try:
+        number = int(request.GET.get("page", 1))
+    except ValueError:
+        number = 0
+    if not 1 <= number <= pages:
+        raise Http404("Invalid page.")
+
+    offset = (number - 1) * page_size
+    page = rows[offset:offset + page_size]
+    if isinstance(page, QuerySet):
+        page = [row async for row in page]
+
+    url = request.build_absolute_uri()
+    if number == 1:
+        previous = None
+    elif number == 2:
+        previous = remove_query_param(url, "page")
+    else:
+        previous = replace_query_param(url, "page", number - 1)
+
+    return {
+        "count": count,
+        "next": replace_query_param(url, "page", number + 1) if number < pages else None,
+        "previous": previous,
+        "results": page,
+    }
+
+
+class AsyncAPIView(View):
+    """
+    Read-only JSON view on the async ORM. Subclasses implement `get_data`;
+    `catalog_cache` caches it per catalog version like CatalogCacheMixin.
+    """
+    catalog_cache = False
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            if self.catalog_cache:
+                return await self.cached_response(request, kwargs)
+            return json_response(await self.get_data(request, **kwargs))
+        except Http404 as exc:
+            return json_response({"detail": str(exc) or "Not found."}, status=404)
+        except serializers.ValidationError as exc:
+            return json_response(exc.detail, status=400)
+
+    async def cached_response(self, request, kwargs):
+        key = await catalog.acache_key(request.build_absolute_uri())
+        cached = await cache.aget(key)
+
+        if cached is None:
+            # filled from the primary, see CatalogCacheMixin
+            with routers.primary_reads():
+                data = await self.get_data(request, **kwargs)
+            cached = (catalog.etag_for(data), data)
+            await cache.aset(key, cached, catalog.cache_timeout())
+
+        etag, data = cached
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = json_response(data)
+
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    async def get_data(self, request, **kwargs):
+        raise NotImplementedError
+
+
+# ---------------- VIEWS ----------------
+class AsyncCarListView(AsyncAPIView):
+    query_budget = 4
+    use_replica = True
+    catalog_cache = True
+
+    async def get_data(self, request):
+        page = await paginate(request, Car.objects.order_by("id").values(*catalog.CAR_FIELDS))
+        page["results"] = await catalog.aserialize_cars(page["results"], request)
+        return page
+
+
+class AsyncCarDetailView(AsyncAPIView):
+    query_budget = 3
+    use_replica = True
+    catalog_cache = True
+
+    async def get_data(self, request, pk):
+        car = await Car.objects.filter(pk=pk).values(*catalog.CAR_FIELDS).afirst()
+        if car is None:
+            raise Http404("No Car matches the given query.")
+        return (await catalog.aserialize_cars([car], request))[0]
+
+
+class AsyncCarAvailabilityView(AsyncAPIView):
+    query_budget = 1
+    use_replica = True
+
+    async def get_data(self, request):
+        params = CarAvailabilitySerializer.from_query(request.GET)
+        params.is_valid(raise_exception=True)
+        search = params.validated_data
+
+        is_available = not await approved_overlapping(
+            search["pickup"], search["return_datetime"]
+        ).filter(car_id=search["car"]).aexists()
+        return {"available": is_available}
+
+
+class AsyncCarExtraListView(AsyncAPIView):
+    query_budget = 1
+
+    async def get_data(self, request):
+        # the process-local extras cache, loaded on a worker thread when cold
+        rows = [
+            {"id": extra.id, "name": extra.name, "price": catalog.decimal_string(extra.price)}
+            for extra in await sync_to_async(extras.all_extras)()
+        ]
+        return await paginate(request, rows)
+
+
+class AsyncDestinationListView(AsyncAPIView):
+    query_budget = 2
+
+    async def get_data(self, request):
+        # Destination has no default ordering; DRF pages it in database order too
+        return await paginate(request, Destination.objects.values("id", "name"))
@@ -0,0 +1,10 @@
+from .models import Reservation
+
+
+def approved_overlapping(start, end):
+    """Approved reservations overlapping [start, end)."""
+    return Reservation.objects.filter(
+        status=Reservation.STATUS_APPROVED,
+        pickup_datetime__lt=end,
+        return_datetime__gt=start,
+    )
@@ -0,0 +1,226 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from . import catalog, pricing
+from .models import Car, CarExtra, CarPricePeriod, Destination, ImgCarExtra, Reservation
+from .serializers import CarSerializer, ReservationSerializer
+
+
+# ---------------- SYNTHETIC DATA ----------------
+FUEL_TYPES = ["Petrol", "Diesel", "Hybrid", "Electric"]
+
+
+def make_periods(car, count, start=date(2026, 1, 1), rng=random):
+    """`count` back-to-back seasonal periods of 3-10 days, unsaved."""
+    periods, current = [], start
+    for _ in range(count):
+        end = current + timedelta(days=rng.randint(3, 10))
+        periods.append(CarPricePeriod(
+            car=car,
+            start_date=current,
+            end_date=end,
+            price_per_day=Decimal(rng.randint(30, 250)),
+        ))
+        current = end
+    return periods
+
+
+def make_fleet(cars, periods_per_car=4, images_per_car=2, seed=1):
+    """Bulk-create a fleet with price periods and extra images; no signals fire."""
+    rng = random.Random(seed)
+    fleet = Car.objects.bulk_create([
+        Car(
+            name=f"Bench car {i}",
+            image=f"cars/bench_{i}.jpg",
+            detail="Synthetic car for benchmarks.",
+            price=Decimal(rng.randint(25, 200)),
+            fuel_type=rng.choice(FUEL_TYPES),
+            seats=rng.choice([2, 4, 5, 7]),
+            transmission=rng.choice(["manual", "automatic"]),
+            air_conditioning=rng.random() > 0.2,
+            doors=rng.choice([3, 5]),
+        )
+        for i in range(cars)
+    ])
+    # SQLite and PostgreSQL return primary keys from bulk_create
+    CarPricePeriod.objects.bulk_create([
+        period for car in fleet for period in make_periods(car, periods_per_car, rng=rng)
+    ])
+    ImgCarExtra.objects.bulk_create([
+        ImgCarExtra(car=car, name=f"View {j}", image=f"cars/extras/bench_{car.pk}_{j}.jpg")
+        for car in fleet
+        for j in range(images_per_car)
+    ])
+    return fleet
+
+
+def make_extras(count, seed=1):
+    rng = random.Random(seed)
+    return CarExtra.objects.bulk_create([
+        CarExtra(name=f"Extra {i}", price=Decimal(rng.randint(2, 25)))
+        for i in range(count)
+    ])
+
+
+def make_destinations(count):
+    return Destination.objects.bulk_create([Destination(name=f"Destination {i}") for i in range(count)])
+
+
+def make_reservations(fleet, count, pending_share=0.0, seed=1):
+    """
+    Historical reservations that never overlap on the same car, created
+    without save(); `pending_share` of them are left pending.
+    """
+    rng = random.Random(seed)
+    next_free = {car.pk: datetime(2024, 1, 1, 10, tzinfo=timezone.utc) for car in fleet}
+    rows = []
+    for _ in range(count):
+        car = rng.choice(fleet)
+        pickup = next_free[car.pk] + timedelta(days=rng.randint(0, 5))
+        dropoff = pickup + timedelta(days=rng.randint(1, 14))
+        next_free[car.pk] = dropoff
+        rows.append(Reservation(
+            car=car,
+            name_surname="Bench Customer",
+            email="bench@example.com",
+            pickup_datetime=pickup,
+            return_datetime=dropoff,
+            status=(
+                Reservation.STATUS_PENDING if rng.random() < pending_share
+                else Reservation.STATUS_APPROVED
+            ),
+        ))
+    return Reservation.objects.bulk_create(rows, batch_size=500)
+
+
+# ---------------- SCRATCH DATABASE ----------------
+@contextmanager
+def scratch_database(sqlite_name=":memory:"):
+    """
+    Run the block on a freshly migrated copy of the default database, created
+    like the test runner's and dropped afterwards; the configured database is
+    never touched. SQLite uses `sqlite_name` (in memory by default), other
+    engines a `scratch_<NAME>` database on the same server.
+    """
+    settings_dict = connection.settings_dict
+    test_settings = settings_dict.setdefault("TEST", {})
+    previous = test_settings.get("NAME")
+    # never the test runner's database, which may be in use
+    if connection.vendor == "sqlite":
+        test_settings["NAME"] = sqlite_name
+    else:
+        test_settings["NAME"] = f"scratch_{settings_dict['NAME']}"
+
+    try:
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        test_settings["NAME"] = previous
+
+
+# ---------------- MEASUREMENT ----------------
+def measure(name, func, repeat=5, **params):
+    """Run `func` `repeat` times; report timings in ms and queries per run."""
+    timings, queries = [], 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = len(captured)
+
+    return {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "queries": queries,
+    }
+
+
+# ---------------- CASES ----------------
+def bench_pricing(repeat):
+    results = []
+    pickup = datetime(2026, 1, 5, 10, tzinfo=timezone.utc)
+    car = Car(price=Decimal("45.00"))
+
+    for period_count in (2, 50):
+        periods = make_periods(car, period_count, rng=random.Random(period_count))
+        for days in (3, 90):
+            dropoff = pickup + timedelta(days=days)
+            results.append(measure(
+                "pricing.quote",
+                lambda: [pricing.quote(car, periods, pickup, dropoff) for _ in range(100)],
+                repeat=repeat,
+                days=days,
+                periods=period_count,
+                calls=100,
+            ))
+    return results
+
+
+def bench_serialization(repeat, sizes=(10, 100, 1000)):
+    results = []
+    request = RequestFactory().get("/api/cars/")
+
+    for size in sizes:
+        Car.objects.all().delete()
+        make_fleet(size)
+
+        def serialize():
+            cars = Car.objects.prefetch_related("extra_images", "price_periods").order_by("id")
+            return CarSerializer(cars, many=True, context={"request": request}).data
+
+        def serialize_lean():
+            return catalog.serialize_cars(list(Car.objects.order_by("id").values(*catalog.CAR_FIELDS)), request)
+
+        results.append(measure("CarSerializer", serialize, repeat=repeat, cars=size))
+        results.append(measure("catalog.serialize_cars", serialize_lean, repeat=repeat, cars=size))
+    return results
+
+
+def bench_reservations(repeat, extras_per_reservation=(0, 5, 20)):
+    results = []
+    car = make_fleet(1, periods_per_car=20)[0]
+    extras = make_extras(max(extras_per_reservation))
+
+    for count in extras_per_reservation:
+        payload = {
+            "car": car.pk,
+            "name_surname": "Bench Customer",
+            "email": "bench@example.com",
+            "pickup_datetime": "2026-02-01T10:00:00Z",
+            "return_datetime": "2026-02-11T10:00:00Z",
+            "extras": [{"id": extra.pk} for extra in extras[:count]],
+        }
+
+        def validate_extras():
+            ReservationSerializer().validate_extras(payload["extras"])
+
+        def create():
+            serializer = ReservationSerializer(data=payload)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        results.append(measure("ReservationSerializer.validate_extras", validate_extras, repeat=repeat, extras=count))
+        results.append(measure("reservation create", create, repeat=repeat, extras=count))
+    return results
+
+
+CASES = {
+    "pricing": bench_pricing,
+    "serialization": bench_serialization,
+    "reservations": bench_reservations,
+}
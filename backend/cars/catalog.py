@@ -0,0 +1,217 @@
+import hashlib
+import json
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils.encoding import filepath_to_uri
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import routers, timing
+from .models import CarPricePeriod, ImgCarExtra
+
+
+# ---------------- CATALOG VERSION ----------------
+# Bumped by signals whenever a Car, ImgCarExtra or CarPricePeriod changes.
+# With a shared cache backend every worker sees the bump at once; with the
+# default per-process cache, CATALOG_CACHE_TIMEOUT bounds staleness instead.
+VERSION_KEY = "catalog:version"
+
+
+def catalog_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def cache_timeout():
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+
+
+def cache_key(*parts):
+    return f"catalog:{catalog_version()}:{key_digest(parts)}"
+
+
+def key_digest(parts):
+    return hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+async def acatalog_version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+async def acache_key(*parts):
+    return f"catalog:{await acatalog_version()}:{key_digest(parts)}"
+
+
+def etag_for(data):
+    payload = json.dumps(data, cls=JSONEncoder, sort_keys=True).encode()
+    return quote_etag(hashlib.md5(payload).hexdigest())
+
+
+# ---------------- CACHED VIEWS ----------------
+class CatalogCacheMixin:
+    """
+    Cache a read-only view's serialized data per catalog version and answer
+    conditional GETs with 304 Not Modified. Misses are filled from the
+    primary: a replica may not have the change that bumped the version yet.
+    """
+
+    def get(self, request, *args, **kwargs):
+        key = cache_key(request.build_absolute_uri())
+        cached = cache.get(key)
+
+        if cached is None:
+            with routers.primary_reads():
+                response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            cached = (etag_for(response.data), response.data)
+            cache.set(key, cached, cache_timeout())
+
+        etag, data = cached
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+# ---------------- LEAN SERIALIZATION ----------------
+# CarSerializer output built from values() rows: no model instances, no
+# per-field serializer calls, one query per child table for the whole page.
+CAR_FIELDS = (
+    "id",
+    "name",
+    "price",
+    "image",
+    "image_variants",
+    "detail",
+    "seats",
+    "transmission",
+    "air_conditioning",
+    "doors",
+    "fuel_type",
+)
+
+
+def decimal_string(value):
+    # DRF renders DecimalFields as fixed-point strings
+    return None if value is None else f"{value:f}"
+
+
+def media_url_builder(request):
+    """
+    Return name -> absolute URL, equal to
+    request.build_absolute_uri(default_storage.url(name)), or None without a
+    request. For local storage the base URL is resolved once per request.
+    """
+    if request is None:
+        return None
+    if isinstance(default_storage, FileSystemStorage):
+        base = request.build_absolute_uri(default_storage.base_url)
+        return lambda name: base + filepath_to_uri(name).lstrip("/")
+    return lambda name: request.build_absolute_uri(default_storage.url(name))
+
+
+def image_fields(row, media_url):
+    name, variants = row["image"], row["image_variants"]
+    if media_url is None:
+        return None, {}
+    return (
+        media_url(name) if name else None,
+        {variant: media_url(stored) for variant, stored in (variants or {}).items()},
+    )
+
+
+def child_rows(ids):
+    images = ImgCarExtra.objects.filter(car_id__in=ids).order_by("id").values(
+        "car_id", "id", "name", "image", "image_variants"
+    )
+    periods = CarPricePeriod.objects.filter(car_id__in=ids).order_by("start_date", "id").values_list(
+        "car_id", "id", "start_date", "end_date", "price_per_day"
+    )
+    return images, periods
+
+
+def build_cars(cars, image_rows, period_rows, request):
+    media_url = media_url_builder(request)
+
+    images = defaultdict(list)
+    for row in image_rows:
+        image, variants = image_fields(row, media_url)
+        images[row["car_id"]].append({
+            "id": row["id"],
+            "name": row["name"],
+            "image": image,
+            "image_variants": variants,
+        })
+
+    periods = defaultdict(list)
+    for car_id, pk, start, end, price in period_rows:
+        periods[car_id].append({
+            "id": pk,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "price_per_day": decimal_string(price),
+        })
+
+    data = []
+    for car in cars:
+        image, variants = image_fields(car, media_url)
+        data.append({
+            "id": car["id"],
+            "name": car["name"],
+            "price": decimal_string(car["price"]),
+            "image": image,
+            "image_variants": variants,
+            "detail": car["detail"],
+            "seats": car["seats"],
+            "transmission": car["transmission"],
+            "air_conditioning": car["air_conditioning"],
+            "doors": car["doors"],
+            "fuel_type": car["fuel_type"],
+            "extra_images": images[car["id"]],
+            "price_periods": periods[car["id"]],
+        })
+    return data
+
+
+def serialize_cars(cars, request):
+    """CarSerializer(many=True) output for `cars`, dicts with CAR_FIELDS."""
+    with timing.span("serialize"):
+        if not cars:
+            return []
+        images, periods = child_rows([car["id"] for car in cars])
+        return build_cars(cars, images, periods, request)
+
+
+async def aserialize_cars(cars, request):
+    """serialize_cars for async views, using the async ORM."""
+    if not cars:
+        return []
+    images, periods = child_rows([car["id"] for car in cars])
+    return build_cars(cars, [row async for row in images], [row async for row in periods], request)
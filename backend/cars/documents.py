@@ -0,0 +1,80 @@
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .models import Reservation
+
+
+logger = logging.getLogger(__name__)
+
+# ---------------- IDENTITY DOCUMENTS ----------------
+DOCUMENT_FIELDS = ("driver_licence_front", "driver_licence_back", "passport")
+
+# longest edge kept for licence/passport scans; still readable when zoomed
+DOCUMENT_MAX_EDGE = 2000
+DOCUMENT_QUALITY = 85
+
+
+def normalize_document(name, storage=default_storage):
+    """
+    Re-encode an uploaded document as an upright, EXIF-free JPEG no larger
+    than DOCUMENT_MAX_EDGE. Returns the stored name of the new file; the
+    original is left in place for the caller to delete.
+    """
+    with storage.open(name, "rb") as source:
+        Image.open(source).verify()
+
+    with storage.open(name, "rb") as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((DOCUMENT_MAX_EDGE, DOCUMENT_MAX_EDGE), Image.LANCZOS)
+
+    # saving without `exif=` drops the metadata (GPS position, device, ...)
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=DOCUMENT_QUALITY, optimize=True)
+
+    stem, _ = os.path.splitext(name)
+    return storage.save(f"{stem}.jpg", ContentFile(buffer.getvalue()))
+
+
+def unprocessed_fields(names, processed):
+    """Document fields of {field: stored name} not yet normalised."""
+    return [field for field, name in names.items() if name and processed.get(field) != name]
+
+
+def process_reservation_documents(pk, fields=DOCUMENT_FIELDS):
+    """Background task: normalise the given document fields of a reservation."""
+    names = Reservation.objects.filter(pk=pk).values(*fields).first()
+    if names is None:
+        return
+
+    for field, name in names.items():
+        if not name:
+            continue
+        try:
+            stored = normalize_document(name)
+        except Exception:
+            logger.exception("Could not process %s of reservation #%s", field, pk)
+            continue
+
+        # only if the document was not replaced while we were working; a
+        # queryset update keeps the save() validation and email signals out of it
+        with transaction.atomic():
+            row = (
+                Reservation.objects.select_for_update()
+                .filter(pk=pk, **{field: name})
+                .values("processed_documents")
+                .first()
+            )
+            if row is not None:
+                processed = {**row["processed_documents"], field: stored}
+                Reservation.objects.filter(pk=pk).update(**{field: stored, "processed_documents": processed})
+        default_storage.delete(name if row is not None else stored)
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+
+from .models import CarExtra
+
+
+# ---------------- PROCESS-LOCAL EXTRAS CACHE ----------------
+# The CarExtra table is tiny and rarely edited. Signals invalidate the cache
+# in the process that saved the change; the timeout bounds staleness in the
+# other workers.
+_cache = {"extras": None, "loaded_at": 0.0}
+
+
+def _timeout():
+    return getattr(settings, "CAR_EXTRAS_CACHE_TIMEOUT", 300)
+
+
+def _cached():
+    extras = _cache["extras"]
+    if extras is None or time.monotonic() - _cache["loaded_at"] > _timeout():
+        extras = {extra.id: extra for extra in CarExtra.objects.all()}
+        _cache.update(extras=extras, loaded_at=time.monotonic())
+    return extras
+
+
+def all_extras():
+    extras = _cached()
+    return [extras[extra_id] for extra_id in sorted(extras)]
+
+
+def get_extras(ids):
+    """Map each known id in `ids` to its CarExtra, with at most one query."""
+    extras = _cached()
+    missing = {extra_id for extra_id in ids if extra_id not in extras}
+
+    if missing:
+        # created in another worker since our last load
+        extras.update(CarExtra.objects.in_bulk(missing))
+
+    return {extra_id: extras[extra_id] for extra_id in ids if extra_id in extras}
+
+
+def invalidate():
+    _cache["extras"] = None
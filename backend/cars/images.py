@@ -0,0 +1,74 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from . import catalog
+
+
+# ---------------- RESPONSIVE VARIANTS ----------------
+# name -> longest edge in pixels
+VARIANTS = {
+    "thumbnail": 320,
+    "card": 768,
+    "full": 1600,
+}
+VARIANT_FORMAT = "WEBP"
+VARIANT_QUALITY = 80
+
+
+def variant_name(name, variant):
+    stem, _ = os.path.splitext(name)
+    return f"{stem}_{variant}.webp"
+
+
+def build_variants(name, storage=default_storage):
+    """Write every variant of the stored image `name`; return {variant: stored name}."""
+    with storage.open(name, "rb") as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    variants = {}
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+
+        buffer = BytesIO()
+        resized.save(buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+
+        target = variant_name(name, variant)
+        if storage.exists(target):
+            storage.delete(target)
+        variants[variant] = storage.save(target, ContentFile(buffer.getvalue()))
+
+    return variants
+
+
+def generate_image_variants(model, pk):
+    """Background task: build variants for `model` row `pk` and store their names."""
+    obj = model.objects.filter(pk=pk).only("image").first()
+    if obj is None or not obj.image:
+        return
+
+    variants = build_variants(obj.image.name)
+
+    # only if the image was not replaced while we were working
+    updated = model.objects.filter(pk=pk, image=obj.image.name).update(image_variants=variants)
+    if updated:
+        # queryset updates skip the signals that normally bump the version
+        catalog.bump_version()
+
+
+def variant_urls(obj, request):
+    if not request:
+        return {}
+    return {
+        variant: request.build_absolute_uri(default_storage.url(name))
+        for variant, name in (obj.image_variants or {}).items()
+    }
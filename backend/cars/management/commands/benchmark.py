@@ -0,0 +1,84 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from cars import benchmarks, extras
+
+
+class Command(BaseCommand):
+    help = (
+        "Time pricing, catalog serialization and reservation creation on synthetic "
+        "data. The cases run on a scratch database (in memory on SQLite, scratch_<NAME> "
+        "elsewhere) that is dropped afterwards, never on the configured one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("cases", nargs="*", help=f"Cases to run: {', '.join(sorted(benchmarks.CASES))} (default: all).")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="Write results as JSON to this file.")
+        parser.add_argument("--compare", help="Previous JSON results to compare against.")
+
+    def handle(self, *args, **options):
+        cases = options["cases"] or sorted(benchmarks.CASES)
+        unknown = set(cases) - set(benchmarks.CASES)
+        if unknown:
+            raise CommandError(f"Unknown case(s): {', '.join(sorted(unknown))}")
+
+        # the cases create and delete rows freely, so give them a database of
+        # their own; live rows are never locked
+        results = []
+        try:
+            with benchmarks.scratch_database():
+                for case in cases:
+                    results.extend(benchmarks.CASES[case](options["repeat"]))
+        finally:
+            # filled from the scratch database
+            extras.invalidate()
+
+        report = {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "results": results,
+        }
+
+        baseline = self.load_baseline(options["compare"]) if options["compare"] else {}
+        for result in results:
+            line = (
+                f"{result['name']:<40} {self.format_params(result['params']):<28} "
+                f"median {result['median_ms']:>10.3f} ms  min {result['min_ms']:>10.3f} ms  "
+                f"queries {result['queries']:>4}"
+            )
+            previous = baseline.get(self.result_key(result))
+            if previous:
+                change = (result["median_ms"] - previous["median_ms"]) / previous["median_ms"] * 100
+                line += f"  {change:+.1f}%"
+            self.stdout.write(line)
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as handle:
+                previous = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        return {self.result_key(result): result for result in previous["results"]}
+
+    @staticmethod
+    def result_key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    @staticmethod
+    def format_params(params):
+        return " ".join(f"{key}={value}" for key, value in params.items())
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from cars.images import generate_image_variants
+from cars.models import Car, ImgCarExtra
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP variants for car images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild images that already have variants.")
+
+    def handle(self, *args, **options):
+        for model in (Car, ImgCarExtra):
+            queryset = model.objects.exclude(image="").exclude(image__isnull=True)
+            if not options["all"]:
+                queryset = queryset.filter(image_variants={})
+
+            for pk in queryset.values_list("pk", flat=True).iterator():
+                try:
+                    generate_image_variants(model, pk)
+                except Exception as exc:
+                    self.stderr.write(f"{model.__name__} #{pk}: {exc}")
+                else:
+                    self.stdout.write(f"{model.__name__} #{pk}: done")
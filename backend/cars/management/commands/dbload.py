@@ -0,0 +1,123 @@
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection
+from django.test import RequestFactory
+
+from cars import benchmarks, catalog
+from cars.availability import approved_overlapping
+from cars.management.commands.loadtest import percentile
+from cars.models import Car
+from cars.serializers import ReservationSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark of the database layer: threads mixing reservation writes with "
+        "catalog and availability reads. It runs on a seeded scratch database with the "
+        "configured engine and options (a temporary file on SQLite, scratch_<NAME> elsewhere) "
+        "that is dropped afterwards, so no live rows or outbox emails are written. Compare "
+        "DATABASE_URL / SQLITE_TUNING / DB_CONN_MAX_AGE settings by running it once per configuration."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=10, help="Seconds to run.")
+        parser.add_argument("--write-share", type=float, default=0.2, help="Share of operations that book.")
+        parser.add_argument("--cars", type=int, default=100, help="Cars in the scratch database.")
+        parser.add_argument("--reservations", type=int, default=5000, help="Historical reservations.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options["cars"] < 1:
+            raise CommandError("--cars must be at least 1.")
+
+        # a file even on SQLite: the shared in-memory database fails on lock
+        # contention instead of waiting for busy_timeout
+        directory = tempfile.mkdtemp(prefix="dbload-")
+        try:
+            with benchmarks.scratch_database(sqlite_name=f"{directory}/dbload.sqlite3"):
+                fleet = benchmarks.make_fleet(options["cars"], seed=options["seed"])
+                benchmarks.make_reservations(fleet, options["reservations"], seed=options["seed"])
+                self.run(options, [car.pk for car in fleet])
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def run(self, options, car_ids):
+        close_old_connections()
+
+        request = RequestFactory().get("/api/cars/")
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def reserve(rng):
+            pickup = datetime(2030, 1, 1, 10, tzinfo=timezone.utc) + timedelta(days=rng.randint(0, 365))
+            serializer = ReservationSerializer(data={
+                "car": rng.choice(car_ids),
+                "name_surname": "Load Test",
+                "email": "dbload@example.com",
+                "pickup_datetime": pickup,
+                "return_datetime": pickup + timedelta(days=rng.randint(1, 7)),
+            })
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+        def read_catalog(rng):
+            catalog.serialize_cars(list(Car.objects.order_by("id").values(*catalog.CAR_FIELDS)[:100]), request)
+
+        def check_availability(rng):
+            pickup = datetime(2024, 1, 1, 10, tzinfo=timezone.utc) + timedelta(days=rng.randint(0, 700))
+            approved_overlapping(pickup, pickup + timedelta(days=3)).filter(car_id=rng.choice(car_ids)).exists()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                while time.monotonic() < deadline:
+                    if rng.random() < options["write_share"]:
+                        name, operation = "reserve", reserve
+                    else:
+                        name, operation = rng.choice([("catalog", read_catalog), ("availability", check_availability)])
+
+                    started = time.perf_counter()
+                    try:
+                        operation(rng)
+                        failed = False
+                    except DatabaseError:
+                        failed = True
+                    elapsed = (time.perf_counter() - started) * 1000
+                    with lock:
+                        latencies[name].append(elapsed)
+                        errors[name] += failed
+            finally:
+                connection.close()
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=worker, args=(options["seed"] + i,)) for i in range(options["threads"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.monotonic() - started
+
+        settings_dict = connection.settings_dict
+        self.stdout.write(
+            f"{connection.vendor} CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']} "
+            f"threads={options['threads']} write share={options['write_share']}"
+        )
+        self.stdout.write(f"{'operation':<14}{'ops':>8}{'errors':>8}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name in sorted(latencies):
+            values = sorted(latencies[name])
+            self.stdout.write(
+                f"{name:<14}{len(values):>8}{errors[name]:>8}{len(values) / wall:>9.1f}"
+                f"{percentile(values, 0.50):>10.1f}{percentile(values, 0.95):>10.1f}{percentile(values, 0.99):>10.1f}"
+            )
@@ -0,0 +1,256 @@
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from io import BytesIO
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = BytesIO()
+    for name, value in fields.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content, content_type) in files.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode()
+        )
+        body.write(content)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def document_photo(size):
+    buffer = BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent traffic against a running server (e.g. `gunicorn config.wsgi -w 4` "
+        "on a database filled by seed_fleet) and report latency percentiles and requests/second "
+        "per endpoint. To compare WSGI with ASGI, run it once against each server "
+        "(`gunicorn config.asgi -k uvicorn.workers.UvicornWorker -w 4`) with --slow-clients, "
+        "then pass the first --output file to the second run as --compare."
+    )
+    requires_system_checks = []
+
+    ENDPOINTS = ("cars", "car-detail", "availability", "fleet-availability", "reservation")
+    # what /api/async serves; the rest of the mix always goes to /api
+    ASYNC_ENDPOINTS = ("cars", "car-detail", "availability")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL.")
+        parser.add_argument(
+            "--prefix", default="/api",
+            help=(
+                "API prefix; /api/async serves cars, car-detail and availability natively async, "
+                "the other endpoints of the mix are then sent to /api."
+            ),
+        )
+        parser.add_argument("--duration", type=float, default=30, help="Seconds to run.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads.")
+        parser.add_argument(
+            "--mix",
+            default="cars=4,car-detail=4,availability=3,fleet-availability=1,reservation=1",
+            help="Relative weights per endpoint.",
+        )
+        parser.add_argument("--photo-size", type=int, default=1600, help="Edge of the uploaded document photo.")
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument(
+            "--slow-clients", type=int, default=0,
+            help="Connections that trickle a large document upload for the whole run.",
+        )
+        parser.add_argument("--slow-path", default="/api/reservations/", help="Target of the slow uploads.")
+        parser.add_argument("--output", help="Write the report as JSON to this file.")
+        parser.add_argument("--compare", help="Previous JSON report to compare against.")
+
+    def handle(self, *args, **options):
+        self.base = options["url"].rstrip("/") + options["prefix"].rstrip("/")
+        self.sync_base = options["url"].rstrip("/") + "/api"
+        if options["prefix"].rstrip("/") == "/api":
+            self.prefixed = self.ENDPOINTS
+        else:
+            self.prefixed = self.ASYNC_ENDPOINTS
+        self.timeout = options["timeout"]
+        weights = self.parse_mix(options["mix"])
+
+        car_ids = self.discover_cars()
+        photo = document_photo((options["photo_size"], options["photo_size"] * 3 // 4))
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def client(seed):
+            rng = random.Random(seed)
+            names, cumulative = list(weights), list(weights.values())
+            while time.monotonic() < deadline:
+                endpoint = rng.choices(names, weights=cumulative)[0]
+                request = self.build_request(endpoint, rng, car_ids, photo)
+                started = time.perf_counter()
+                ok = self.send(request)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies[endpoint].append(elapsed)
+                    if not ok:
+                        errors[endpoint] += 1
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=client, args=(seed,)) for seed in range(options["concurrency"])]
+        threads += [
+            threading.Thread(target=self.slow_upload, args=(options["url"], options["slow_path"], deadline))
+            for _ in range(options["slow_clients"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.monotonic() - started
+
+        report = {
+            "url": self.base,
+            "concurrency": options["concurrency"],
+            "slow_clients": options["slow_clients"],
+            "duration_s": round(wall, 2),
+            "endpoints": {},
+        }
+        for endpoint in sorted(latencies):
+            values = sorted(latencies[endpoint])
+            report["endpoints"][endpoint] = {
+                "requests": len(values),
+                "errors": errors[endpoint],
+                "rps": round(len(values) / wall, 1),
+                "p50_ms": round(percentile(values, 0.50), 1),
+                "p95_ms": round(percentile(values, 0.95), 1),
+                "p99_ms": round(percentile(values, 0.99), 1),
+            }
+
+        baseline = self.load_baseline(options["compare"]) if options["compare"] else {}
+        self.stdout.write(f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for endpoint, stats in report["endpoints"].items():
+            line = (
+                f"{endpoint:<20}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>9}"
+                f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+            )
+            previous = baseline.get(endpoint)
+            if previous and previous["rps"] and previous["p95_ms"]:
+                line += (
+                    f"  rps {(stats['rps'] - previous['rps']) / previous['rps'] * 100:+.1f}%"
+                    f"  p95 {(stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100:+.1f}%"
+                )
+            self.stdout.write(line)
+        total = sum(stats["requests"] for stats in report["endpoints"].values())
+        self.stdout.write(f"total {total} requests in {wall:.1f}s = {total / wall:.1f} req/s")
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as handle:
+                return json.load(handle)["endpoints"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+    def parse_mix(self, mix):
+        weights = {}
+        for part in mix.split(","):
+            name, _, weight = part.partition("=")
+            if name not in self.ENDPOINTS:
+                raise CommandError(f"Unknown endpoint {name!r}; choose from {', '.join(self.ENDPOINTS)}")
+            weights[name] = float(weight or 1)
+        return weights
+
+    def discover_cars(self):
+        try:
+            with urlopen(f"{self.base}/cars/", timeout=self.timeout) as response:
+                data = json.load(response)
+        except (URLError, ValueError) as exc:
+            raise CommandError(f"Cannot list cars at {self.base}/cars/: {exc}")
+
+        cars = data["results"] if isinstance(data, dict) else data
+        if not cars:
+            raise CommandError("No cars found; run `manage.py seed_fleet` first.")
+        return [car["id"] for car in cars]
+
+    def build_request(self, endpoint, rng, car_ids, photo):
+        base = self.base if endpoint in self.prefixed else self.sync_base
+        car = rng.choice(car_ids)
+        day = rng.randint(1, 27)
+        pickup, dropoff = f"2026-08-{day:02d}T10:00:00Z", f"2026-08-{day + 1:02d}T10:00:00Z"
+
+        if endpoint == "cars":
+            return Request(f"{base}/cars/")
+        if endpoint == "car-detail":
+            return Request(f"{base}/cars/{car}/")
+        if endpoint == "availability":
+            query = urlencode({"car": car, "pickup": pickup, "return": dropoff})
+            return Request(f"{base}/cars/availability/?{query}")
+        if endpoint == "fleet-availability":
+            query = urlencode({"pickup": pickup, "return": dropoff})
+            return Request(f"{base}/cars/available/?{query}")
+
+        body, content_type = multipart(
+            {
+                "car": car,
+                "name_surname": "Load Test",
+                "email": "loadtest@example.com",
+                "pickup_datetime": pickup,
+                "return_datetime": dropoff,
+            },
+            {"driver_licence_front": ("licence.jpg", photo, "image/jpeg")},
+        )
+        return Request(
+            f"{base}/reservations/", data=body, method="POST", headers={"Content-Type": content_type}
+        )
+
+    def send(self, request):
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status < 400
+        except HTTPError as exc:
+            exc.read()
+            return False
+        except (URLError, OSError):
+            return False
+
+    def slow_upload(self, url, path, deadline):
+        """Hold one connection open by sending a large upload a few hundred bytes at a time."""
+        parts = urlsplit(url)
+        try:
+            with socket.create_connection((parts.hostname, parts.port or 80), timeout=self.timeout) as sock:
+                sock.sendall(
+                    f"POST {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                    "Content-Type: multipart/form-data; boundary=slow\r\n"
+                    f"Content-Length: {50 * 1024 * 1024}\r\n\r\n".encode()
+                )
+                while time.monotonic() < deadline:
+                    sock.sendall(b"x" * 256)
+                    time.sleep(0.25)
+        except OSError:
+            pass
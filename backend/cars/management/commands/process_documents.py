@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from cars.documents import DOCUMENT_FIELDS, process_reservation_documents, unprocessed_fields
+from cars.models import Reservation
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalise uploaded licence and passport scans the background task has not "
+        "processed, e.g. because the worker restarted before it ran."
+    )
+
+    def handle(self, *args, **options):
+        uploaded = Q()
+        for field in DOCUMENT_FIELDS:
+            uploaded |= Q(**{f"{field}__gt": ""})
+        rows = Reservation.objects.filter(uploaded).values("pk", "processed_documents", *DOCUMENT_FIELDS)
+
+        for row in rows.iterator():
+            names = {field: row[field] for field in DOCUMENT_FIELDS}
+            fields = unprocessed_fields(names, row["processed_documents"])
+            if not fields:
+                continue
+
+            process_reservation_documents(row["pk"], fields)
+            self.stdout.write(f"Reservation #{row['pk']}: {', '.join(fields)}")
@@ -0,0 +1,51 @@
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cars.middleware import PROFILE_SUFFIX
+
+
+class Command(BaseCommand):
+    help = "Aggregate the request profiles written by RequestProfilerMiddleware into a hot-function report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Profile directory (default: REQUEST_PROFILING_DIR).")
+        parser.add_argument("--path", help="Only profiles whose request path contains this text, e.g. api-cars.")
+        parser.add_argument("--top", type=int, default=25, help="Number of functions to show.")
+        parser.add_argument(
+            "--sort", default="cumulative", choices=["cumulative", "tottime", "ncalls"],
+            help="Order of the report.",
+        )
+        parser.add_argument(
+            "--filter", default="",
+            help="Regex restricting the listed functions, e.g. 'cars/' for project code only.",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options["dir"] or getattr(settings, "REQUEST_PROFILING_DIR", settings.BASE_DIR / "profiles"))
+        dumps = sorted(directory.glob(f"*{PROFILE_SUFFIX}"))
+        if options["path"]:
+            dumps = [dump for dump in dumps if options["path"] in dump.name]
+        if not dumps:
+            raise CommandError(f"No profiles found in {directory}")
+
+        stats, loaded = pstats.Stats(stream=self.stdout), 0
+        for dump in dumps:
+            try:
+                stats.add(str(dump))
+            except (OSError, EOFError, ValueError):
+                # trimmed by a worker while we were reading
+                continue
+            loaded += 1
+
+        self.stdout.write(f"{loaded} profile(s) from {directory}")
+        restrictions = [options["top"]]
+        if options["filter"]:
+            # match against full paths, so keep the directories
+            restrictions.insert(0, options["filter"])
+        else:
+            stats.strip_dirs()
+        stats.sort_stats(options["sort"])
+        stats.print_stats(*restrictions)
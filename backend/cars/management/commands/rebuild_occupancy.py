@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cars import occupancy
+from cars.models import CarOccupancy, Reservation
+
+
+class Command(BaseCommand):
+    help = "Recompute every car's occupancy bitmaps from approved reservations."
+
+    def handle(self, *args, **options):
+        approved = Reservation.objects.filter(status=Reservation.STATUS_APPROVED).values_list(
+            "car_id", "pickup_datetime", "return_datetime"
+        )
+        masks = occupancy.build_masks(approved.iterator())
+
+        with transaction.atomic():
+            CarOccupancy.objects.all().delete()
+            CarOccupancy.objects.bulk_create(
+                [CarOccupancy(car_id=car_id, month=month, days=days) for (car_id, month), days in masks.items()],
+                batch_size=1000,
+            )
+
+        cars = len({car_id for car_id, _ in masks})
+        self.stdout.write(f"Rebuilt occupancy for {cars} car(s).")
@@ -0,0 +1,44 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cars import benchmarks, catalog, extras
+from cars.models import Reservation
+
+
+class Command(BaseCommand):
+    help = "Bulk-create a synthetic fleet with price periods, images, extras, destinations and reservations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cars", type=int, default=100)
+        parser.add_argument("--periods", type=int, default=6, help="Seasonal price periods per car.")
+        parser.add_argument("--images", type=int, default=3, help="Extra images per car.")
+        parser.add_argument("--extras", type=int, default=8)
+        parser.add_argument("--destinations", type=int, default=10)
+        parser.add_argument("--reservations", type=int, default=10000, help="Historical reservations.")
+        parser.add_argument("--pending", type=float, default=0.1, help="Share of reservations left pending.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fleet = benchmarks.make_fleet(
+                options["cars"],
+                periods_per_car=options["periods"],
+                images_per_car=options["images"],
+                seed=options["seed"],
+            )
+            benchmarks.make_extras(options["extras"], seed=options["seed"])
+            benchmarks.make_destinations(options["destinations"])
+            reservations = benchmarks.make_reservations(
+                fleet, options["reservations"], pending_share=options["pending"], seed=options["seed"]
+            )
+
+        # bulk_create skips the signals that maintain these
+        catalog.bump_version()
+        extras.invalidate()
+        call_command("rebuild_occupancy", stdout=self.stdout)
+
+        pending = sum(r.status == Reservation.STATUS_PENDING for r in reservations)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(fleet)} cars and {len(reservations)} reservations ({pending} pending)."
+        ))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cars import outbox
+
+
+class Command(BaseCommand):
+    help = "Send pending emails from the outbox, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument("--backoff", type=int, default=60, help="Base retry delay in seconds.")
+        parser.add_argument(
+            "--lease", type=int, default=600,
+            help="Seconds a claimed batch stays hidden from other workers while it is sent.",
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting.")
+        parser.add_argument("--interval", type=float, default=5, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.drain(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+                backoff=options["backoff"],
+                lease=options["lease"],
+            )
+            if sent or failed:
+                self.stdout.write(f"sent {sent}, failed {failed}")
+
+            if not options["loop"]:
+                return
+
+            # a full batch means more may be waiting
+            if sent + failed < options["batch_size"]:
+                time.sleep(options["interval"])
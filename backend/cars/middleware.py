@@ -0,0 +1,196 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from . import routers, timing
+
+
+logger = logging.getLogger("cars.requests")
+
+PROFILE_SUFFIX = ".prof"
+
+
+class RequestTimingMiddleware:
+    """
+    Opt-in (REQUEST_TIMING) per-request instrumentation.
+
+    Records query count, DB time, serialization time, view time and render
+    time, returns them as a Server-Timing header and logs one line per
+    request. Requests running more queries than the view's `query_budget`
+    (or REQUEST_QUERY_BUDGET) are logged as warnings with the most
+    repeated statement, which is usually an N+1 that crept back in.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.default_budget = getattr(settings, "REQUEST_QUERY_BUDGET", 20)
+
+    def __call__(self, request):
+        metrics = timing.RequestMetrics()
+        request._timing = metrics
+        request._timing_budget = self.default_budget
+        token = timing.activate(metrics)
+        started = time.perf_counter()
+
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            timing.deactivate(token)
+
+        total_ms = (time.perf_counter() - started) * 1000
+        view_started = getattr(request, "_timing_view_started", None)
+        view_finished = getattr(request, "_timing_view_finished", None)
+        if view_started is not None:
+            end = view_finished or time.perf_counter()
+            metrics.spans["view"] = (end - view_started) * 1000
+        if view_finished is not None:
+            metrics.spans["render"] = (time.perf_counter() - view_finished) * 1000
+
+        response["Server-Timing"] = self.server_timing(metrics, total_ms)
+        response["Timing-Allow-Origin"] = "*"
+        self.log(request, response, metrics, total_ms)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+        budget = getattr(view_class, "query_budget", None)
+        if budget is not None:
+            request._timing_budget = budget
+        request._timing_view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook; the rest is render time
+        request._timing_view_finished = time.perf_counter()
+        return response
+
+    @staticmethod
+    def server_timing(metrics, total_ms):
+        entries = [f'db;dur={metrics.db_ms:.1f};desc="{metrics.queries} queries"']
+        for name in ("serialize", "view", "render"):
+            if name in metrics.spans:
+                entries.append(f"{name};dur={metrics.spans[name]:.1f}")
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+    @staticmethod
+    def log(request, response, metrics, total_ms):
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_ms, 1),
+            **{f"{name}_ms": round(value, 1) for name, value in metrics.spans.items()},
+            "total_ms": round(total_ms, 1),
+            "query_budget": request._timing_budget,
+        }
+        message = " ".join(f"{key}={value}" for key, value in fields.items())
+
+        if metrics.queries > request._timing_budget:
+            statement, count = metrics.repeated_statement()
+            fields["repeated_sql"] = statement
+            fields["repeated_count"] = count
+            logger.warning(
+                "query budget exceeded %s repeated=%dx %s",
+                message, count, statement, extra={"timing": fields},
+            )
+        else:
+            logger.info(message, extra={"timing": fields})
+
+
+class RequestProfilerMiddleware:
+    """
+    Opt-in cProfile sampling of live requests.
+
+    A REQUEST_PROFILING_RATE fraction of requests is profiled, plus any
+    request whose X-Profile header matches REQUEST_PROFILING_TOKEN. The
+    profile covers everything the request runs (view, serializers,
+    calculate_price, signal handlers) and is written to a ring buffer of
+    the newest REQUEST_PROFILING_KEEP dumps in REQUEST_PROFILING_DIR.
+    Aggregate them with `manage.py profile_report`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rate = getattr(settings, "REQUEST_PROFILING_RATE", 0.0)
+        self.token = getattr(settings, "REQUEST_PROFILING_TOKEN", "")
+        self.directory = Path(getattr(settings, "REQUEST_PROFILING_DIR", settings.BASE_DIR / "profiles"))
+        self.keep = getattr(settings, "REQUEST_PROFILING_KEEP", 200)
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already active on this thread
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        try:
+            response["X-Profile-Id"] = self.save(profiler, request)
+        except OSError:
+            logger.exception("Could not write request profile")
+        return response
+
+    def should_profile(self, request):
+        if self.token and request.headers.get("X-Profile") == self.token:
+            return True
+        return self.rate > 0 and random.random() < self.rate
+
+    def save(self, profiler, request):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        name = f"{time.time_ns()}-{os.getpid()}-{request.method}-{slug[:80]}{PROFILE_SUFFIX}"
+
+        # write under a temporary name so the report never reads half a dump
+        partial = self.directory / f".{name}.tmp"
+        profiler.dump_stats(partial)
+        os.replace(partial, self.directory / name)
+
+        self.trim()
+        return name
+
+    def trim(self):
+        dumps = sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"))
+        for stale in dumps[:-max(self.keep, 1)]:
+            stale.unlink(missing_ok=True)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests to views with `use_replica = True` read from the
+    replicas (see cars.routers.ReplicaRouter); all other requests, the admin
+    included, stay on the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routers.begin()
+        try:
+            return self.get_response(request)
+        finally:
+            routers.end(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+        if getattr(view_class, "use_replica", False) and request.method in ("GET", "HEAD", "OPTIONS"):
+            routers.allow_replica_reads()
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0009_reservation_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carpriceperiod',
+            index=models.Index(fields=['car', 'start_date', 'end_date'], name='price_period_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['car', 'status', 'return_datetime', 'pickup_datetime'], name='reservation_overlap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'return_datetime', 'pickup_datetime', 'car'], name='reservation_window_idx'),
+        ),
+    ]
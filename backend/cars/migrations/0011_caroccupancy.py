@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 07:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0010_booking_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CarOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('days', models.PositiveIntegerField(default=0)),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='cars.car')),
+            ],
+            options={
+                'ordering': ['car', 'month'],
+                'indexes': [models.Index(fields=['month'], name='occupancy_month_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='caroccupancy',
+            constraint=models.UniqueConstraint(fields=('car', 'month'), name='unique_car_month_occupancy'),
+        ),
+    ]
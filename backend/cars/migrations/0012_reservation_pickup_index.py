@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0011_caroccupancy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['pickup_datetime'], name='reservation_pickup_idx'),
+        ),
+    ]
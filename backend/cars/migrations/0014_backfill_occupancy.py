@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from cars.occupancy import build_masks
+
+
+def backfill_occupancy(apps, schema_editor):
+    """Fill the calendars from the approved reservations that predate them."""
+    CarOccupancy = apps.get_model("cars", "CarOccupancy")
+    Reservation = apps.get_model("cars", "Reservation")
+
+    approved = Reservation.objects.filter(status="approved").values_list(
+        "car_id", "pickup_datetime", "return_datetime"
+    )
+    masks = build_masks(approved.iterator())
+
+    CarOccupancy.objects.all().delete()
+    CarOccupancy.objects.bulk_create(
+        [CarOccupancy(car_id=car_id, month=month, days=days) for (car_id, month), days in masks.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0013_reservation_search_trigram'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cars', '0014_backfill_occupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='processed_documents',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,12 +1,88 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.core.exceptions import ValidationError
-from datetime import timedelta
-from decimal import Decimal
-import phonenumbers
+from django.utils import timezone
+import copy
+
+from . import phones, pricing
+
+
+# ---------------- CHANGE TRACKING ----------------
+class TrackChangesMixin:
+    """
+    Remember the field values a row was loaded with, so hooks can compare
+    old and new values without re-reading the row.
+    """
+    _loaded_values = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember(field_names)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        # also how Django loads a deferred field on first access
+        super().refresh_from_db(using=using, fields=fields)
+
+        if fields is None:
+            deferred = self.get_deferred_fields()
+            attnames = [f.attname for f in self._meta.concrete_fields if f.attname not in deferred]
+        else:
+            attnames = [self._meta.get_field(name).attname for name in fields]
+        self._remember(attnames)
+
+    def _remember(self, attnames):
+        loaded = dict(self._loaded_values or {})
+        for attname in attnames:
+            loaded[attname] = self._comparable(attname)
+        self._loaded_values = loaded
+
+    def _comparable(self, attname):
+        value = getattr(self, attname)
+        if isinstance(value, models.fields.files.FieldFile):
+            return value.name or None
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+
+    def is_tracked(self, attname):
+        return self._loaded_values is not None and attname in self._loaded_values
+
+    def loaded_value(self, attname):
+        """Value `attname` had when the row was loaded or last saved."""
+        return self._loaded_values[attname]
+
+    def has_changed(self, attname):
+        if attname in self.get_deferred_fields():
+            # never loaded nor assigned, so it cannot have changed
+            return False
+        if not self.is_tracked(attname):
+            return True
+        return self._loaded_values[attname] != self._comparable(attname)
+
+    def dirty_fields(self):
+        """Names of concrete fields changed since load, usable as `update_fields`."""
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and self.has_changed(field.attname)
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            attnames = [field.attname for field in self._meta.concrete_fields]
+        else:
+            attnames = [self._meta.get_field(name).attname for name in update_fields]
+        # reading a deferred field would load it with a query of its own
+        deferred = self.get_deferred_fields()
+        self._remember([attname for attname in attnames if attname not in deferred])
 
 
 # ---------------- CAR ----------------
-class Car(models.Model):
+class Car(TrackChangesMixin, models.Model):
     TRANSMISSION_CHOICES = [
         ('manual', 'Manual'),
         ('automatic', 'Automatic'),
@@ -14,6 +90,8 @@ class Car(models.Model):
 
     name = models.CharField(max_length=200, blank=True, null=True)
     image = models.ImageField(upload_to='cars/', blank=True, null=True)
+    # resized WebP copies of `image`, filled in by a background task
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     detail = models.TextField(blank=True, null=True)
 
     # fallback price
@@ -38,6 +116,9 @@ class CarPricePeriod(models.Model):
 
     class Meta:
         ordering = ["start_date"]
+        indexes = [
+            models.Index(fields=["car", "start_date", "end_date"], name="price_period_range_idx"),
+        ]
 
     def clean(self):
         if self.start_date >= self.end_date:
@@ -65,17 +146,18 @@ class Destination(models.Model):
 
 
 # ---------------- EXTRA IMAGES ----------------
-class ImgCarExtra(models.Model):
+class ImgCarExtra(TrackChangesMixin, models.Model):
     car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name="extra_images")
     name = models.CharField(max_length=150, blank=True, null=True)
     image = models.ImageField(upload_to='cars/extras/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.car.name} - {self.name or 'Extra Image'}"
 
 
 # ---------------- RESERVATION ----------------
-class Reservation(models.Model):
+class Reservation(TrackChangesMixin, models.Model):
     STATUS_PENDING = 'pending'
     STATUS_APPROVED = 'approved'
     STATUS_REJECTED = 'rejected'
@@ -99,6 +181,9 @@ class Reservation(models.Model):
     driver_licence_front = models.ImageField(upload_to='passports/', blank=True, null=True)
     driver_licence_back = models.ImageField(upload_to='passports/', blank=True, null=True)
     passport = models.ImageField(upload_to='passports/', blank=True, null=True)
+    # {field: stored name} of the documents already normalised by the
+    # background task; anything else is picked up by `process_documents`
+    processed_documents = models.JSONField(default=dict, blank=True, editable=False)
 
     extras = models.JSONField(default=list, blank=True)
 
@@ -110,80 +195,49 @@ class Reservation(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination of the reservation list, optionally filtered
+            models.Index(fields=["-created_at", "-id"], name="reservation_created_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="reservation_status_created_idx"),
+            models.Index(fields=["car", "-created_at", "-id"], name="reservation_car_created_idx"),
+            # overlap checks for one car or the whole fleet. return_datetime
+            # leads the range part so past reservations are skipped entirely.
+            models.Index(
+                fields=["car", "status", "return_datetime", "pickup_datetime"],
+                name="reservation_overlap_idx",
+            ),
+            models.Index(
+                fields=["status", "return_datetime", "pickup_datetime", "car"],
+                name="reservation_window_idx",
+            ),
+            # admin date_hierarchy drill-down and its min/max lookup
+            models.Index(fields=["pickup_datetime"], name="reservation_pickup_idx"),
+        ]
+
     # ---------- PRICE CALCULATOR ----------
     def calculate_price(self):
-        if not self.pickup_datetime or not self.return_datetime:
-            return 0, Decimal("0.00"), Decimal("0.00")
-
-        if self.return_datetime <= self.pickup_datetime:
-            return 0, Decimal("0.00"), Decimal("0.00")
-
-        car_total = Decimal("0.00")
-        extras_total = Decimal("0.00")
-
-        # -------- DAY CALCULATION WITH 3-HOUR RULE --------
-        pickup = self.pickup_datetime
-        dropoff = self.return_datetime
+        if not pricing.rental_days(self.pickup_datetime, self.return_datetime):
+            return 0, pricing.ZERO, pricing.ZERO
 
-        base_days = (dropoff.date() - pickup.date()).days
+        return pricing.quote(
+            self.car,
+            self.car.price_periods.all(),
+            self.pickup_datetime,
+            self.return_datetime,
+            self.extras,
+        )
 
-        # Calculate hour difference between pickup hour and dropoff hour
-        time_difference = dropoff - (pickup + timedelta(days=base_days))
-        extra_hours = time_difference.total_seconds() / 3600
-
-        if extra_hours >= 3:
-            days = base_days + 1
-        else:
-            days = base_days
-
-        # Safety: minimum 1 day
-        if days <= 0:
-            days = 1
-
-        # -------- CAR PRICE CALCULATION --------
-        current = pickup.date()
-        periods = list(self.car.price_periods.all())
-
-        for _ in range(days):
-            period = next(
-                (p for p in periods if p.start_date <= current < p.end_date),
-                None
-            )
-
-            if period:
-                price = Decimal(period.price_per_day)
-            else:
-                if not self.car.price:
-                    raise ValidationError(f"No price defined for {current}")
-                price = Decimal(self.car.price)
-
-            car_total += price
-            current += timedelta(days=1)
-
-        # -------- EXTRAS --------
-        if self.extras:
-            for extra in self.extras:
-                try:
-                    extra_price = Decimal(str(extra.get("price", 0)))
-                    extras_total += extra_price * days
-                except:
-                    pass
-
-        final_total = car_total + extras_total
-
-        return days, car_total, final_total
     # ---------- VALIDATION ----------
     def clean(self):
         super().clean()
 
-        if self.phone_number:
+        # the stored number was normalised when it was saved
+        if self.phone_number and self.has_changed("phone_number"):
             try:
-                parsed = phonenumbers.parse(self.phone_number, None)
-                if not phonenumbers.is_valid_number(parsed):
-                    raise ValidationError({'phone_number': 'Invalid phone number.'})
-                self.phone_number = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-            except phonenumbers.NumberParseException:
-                raise ValidationError({'phone_number': 'Invalid phone number format.'})
+                self.phone_number = phones.normalize(self.phone_number)
+            except ValidationError as exc:
+                raise ValidationError({'phone_number': exc.messages})
 
         if self.status == self.STATUS_PENDING:
             return
@@ -194,19 +248,52 @@ class Reservation(models.Model):
         if self.pickup_datetime >= self.return_datetime:
             raise ValidationError("Return must be after pickup")
 
-        
+        if self.status == self.STATUS_APPROVED and self.conflicting_reservations().exists():
+            raise ValidationError("This car is already booked for the selected dates.")
+
+    # ---------- DOUBLE BOOKING ----------
+    def conflicting_reservations(self):
+        return Reservation.objects.filter(
+            car_id=self.car_id,
+            status=self.STATUS_APPROVED,
+            pickup_datetime__lt=self.return_datetime,
+            return_datetime__gt=self.pickup_datetime,
+        ).exclude(pk=self.pk)
+
+    def lock_car(self):
+        """
+        Serialise approvals for this car until the transaction ends, so the
+        overlap check in clean() cannot race another approval.
+        """
+        if connection.features.has_select_for_update:
+            list(Car.objects.select_for_update().filter(pk=self.car_id).values_list("pk"))
+        else:
+            # SQLite has no row locks; a write takes the database write lock
+            Car.objects.filter(pk=self.car_id).update(name=models.F("name"))
+
+    def approve(self):
+        self.status = self.STATUS_APPROVED
+        self.save()
+
+    def reject(self):
+        self.status = self.STATUS_REJECTED
+        self.save()
 
     # ---------- SAVE ----------
     def save(self, *args, **kwargs):
-        self.full_clean()
+        with transaction.atomic():
+            if self.status == self.STATUS_APPROVED and self.car_id:
+                self.lock_car()
 
-        if self.pickup_datetime and self.return_datetime:
-            days, car_total, final_total = self.calculate_price()
-            self.total_days = days
-            self.car_price_total = car_total
-            self.total_price = final_total
+            self.full_clean()
 
-        super().save(*args, **kwargs)
+            if self.pickup_datetime and self.return_datetime:
+                days, car_total, final_total = self.calculate_price()
+                self.total_days = days
+                self.car_price_total = car_total
+                self.total_price = final_total
+
+            super().save(*args, **kwargs)
 
 
 # ---------------- OPTIONAL EXTRAS ----------------
@@ -216,3 +303,58 @@ class CarExtra(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.price})"
+
+
+# ---------------- EMAIL OUTBOX ----------------
+class OutboxEmail(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.recipients)} ({self.status})"
+
+
+# ---------------- OCCUPANCY CALENDAR ----------------
+class CarOccupancy(models.Model):
+    """Days of one month a car is booked, as a bitmap (bit 0 = 1st)."""
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name="occupancy")
+    month = models.DateField()
+    days = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["car", "month"]
+        constraints = [
+            models.UniqueConstraint(fields=["car", "month"], name="unique_car_month_occupancy"),
+        ]
+        indexes = [
+            models.Index(fields=["month"], name="occupancy_month_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.car} {self.month:%Y-%m}"
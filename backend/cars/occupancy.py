@@ -0,0 +1,145 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import CarOccupancy, Reservation
+
+
+# ---------------- MONTH HELPERS ----------------
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def months_between(first_day, last_day):
+    month = month_start(first_day)
+    while month <= last_day:
+        yield month
+        month = next_month(month)
+
+
+def occupied_range(pickup, dropoff):
+    """First and last local calendar day touched by [pickup, dropoff)."""
+    first = timezone.localtime(pickup).date()
+    # returning exactly at midnight leaves that day free
+    last = timezone.localtime(dropoff - timedelta(microseconds=1)).date()
+    return first, max(first, last)
+
+
+def day_mask(first, last, month):
+    """Bitmap of the days of `month` between `first` and `last` inclusive."""
+    end = next_month(month) - timedelta(days=1)
+    first, last = max(first, month), min(last, end)
+    if first > last:
+        return 0
+    return ((1 << (last.day - first.day + 1)) - 1) << (first.day - 1)
+
+
+def mask_days(mask):
+    return [bit + 1 for bit in range(31) if mask >> bit & 1]
+
+
+# ---------------- MAINTENANCE ----------------
+TRACKED_FIELDS = ("car_id", "status", "pickup_datetime", "return_datetime")
+
+
+def build_masks(rows):
+    """{(car_id, month): bitmap} for (car_id, pickup, return) rows of approved reservations."""
+    masks = defaultdict(int)
+    for car_id, pickup, dropoff in rows:
+        if not (pickup and dropoff and dropoff > pickup):
+            continue
+        first, last = occupied_range(pickup, dropoff)
+        for month in months_between(first, last):
+            masks[car_id, month] |= day_mask(first, last, month)
+    return masks
+
+
+def rebuild(car_id, months):
+    """Recompute the bitmaps of `car_id` for the given months from approved reservations."""
+    months = sorted(set(months))
+    if not months:
+        return
+
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(months[0], time.min), tz)
+    end = timezone.make_aware(datetime.combine(next_month(months[-1]), time.min), tz)
+
+    masks = dict.fromkeys(months, 0)
+    rows = Reservation.objects.filter(
+        car_id=car_id,
+        status=Reservation.STATUS_APPROVED,
+        pickup_datetime__lt=end,
+        return_datetime__gt=start,
+    ).values_list("pickup_datetime", "return_datetime")
+
+    for pickup, dropoff in rows:
+        first, last = occupied_range(pickup, dropoff)
+        for month in months:
+            masks[month] |= day_mask(first, last, month)
+
+    # empty months are dropped rather than stored as 0, which also keeps a
+    # cascading car delete from re-inserting rows for the deleted car
+    CarOccupancy.objects.filter(
+        car_id=car_id, month__in=[month for month, mask in masks.items() if not mask]
+    ).delete()
+    CarOccupancy.objects.bulk_create(
+        [CarOccupancy(car_id=car_id, month=month, days=mask) for month, mask in masks.items() if mask],
+        update_conflicts=True,
+        unique_fields=["car", "month"],
+        update_fields=["days"],
+    )
+
+
+def affected_months(*ranges):
+    months = set()
+    for pickup, dropoff in ranges:
+        if pickup and dropoff and dropoff > pickup:
+            months.update(months_between(*occupied_range(pickup, dropoff)))
+    return months
+
+
+def reservation_changed(reservation, deleted=False):
+    """Update the bitmaps touched by a reservation being saved or deleted."""
+    if not deleted and not any(reservation.has_changed(field) for field in TRACKED_FIELDS):
+        return
+
+    touched = defaultdict(set)
+    if reservation.status == Reservation.STATUS_APPROVED:
+        touched[reservation.car_id] |= affected_months(
+            (reservation.pickup_datetime, reservation.return_datetime)
+        )
+
+    # the dates it used to occupy, possibly on another car
+    if all(reservation.is_tracked(field) for field in TRACKED_FIELDS):
+        if reservation.loaded_value("status") == Reservation.STATUS_APPROVED:
+            touched[reservation.loaded_value("car_id")] |= affected_months(
+                (reservation.loaded_value("pickup_datetime"), reservation.loaded_value("return_datetime"))
+            )
+
+    for car_id, months in touched.items():
+        rebuild(car_id, months)
+
+
+# ---------------- READS ----------------
+def parse_month(value):
+    """'YYYY-MM' -> first day of that month; raises ValueError."""
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def car_month(car_id, month):
+    mask = CarOccupancy.objects.filter(car_id=car_id, month=month).values_list("days", flat=True).first()
+    return mask or 0
+
+
+def fleet_month(month):
+    return dict(CarOccupancy.objects.filter(month=month).values_list("car_id", "days"))
+
+
+def current_month():
+    return month_start(timezone.localdate())
+
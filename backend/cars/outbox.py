@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def enqueue(subject, message, recipients):
+    """Store an email for the outbox worker instead of sending it inline."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def retry_delay(attempts, backoff):
+    # 1x, 2x, 4x, ... the base backoff, capped at one day
+    return timedelta(seconds=min(backoff * 2 ** (attempts - 1), 86400))
+
+
+def claim(batch_size, lease):
+    """
+    Lease a batch of due emails in a short transaction: pushing their
+    next_attempt_at past the lease hides them from other workers while
+    this one sends, and a crashed worker's batch is retried once it lapses.
+    """
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if batch:
+            leased_until = timezone.now() + timedelta(seconds=lease)
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(next_attempt_at=leased_until)
+    return batch
+
+
+def drain(batch_size=50, max_attempts=5, backoff=60, lease=600, connection=None):
+    """
+    Send due outbox emails over one reused connection.
+
+    The batch is claimed first and sent with no transaction open, so a slow
+    SMTP server never holds database locks; each result is recorded with its
+    own short update. Failed sends are retried with exponential backoff and
+    marked failed after `max_attempts`. Returns (sent, failed) counts for
+    this batch.
+    """
+    batch = claim(batch_size, lease)
+    if not batch:
+        return 0, 0
+
+    connection = connection or mail.get_connection(fail_silently=False)
+    sent = failed = 0
+
+    try:
+        for email in batch:
+            message = mail.EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.recipients,
+                connection=connection,
+            )
+            attempts = email.attempts + 1
+            try:
+                # no-op while the connection is already open
+                connection.open()
+                message.send()
+            except Exception as exc:
+                # drop a possibly broken connection; the next send reopens it
+                connection.close()
+
+                updates = {"attempts": attempts, "last_error": f"{type(exc).__name__}: {exc}"}
+                if attempts >= max_attempts:
+                    updates["status"] = OutboxEmail.STATUS_FAILED
+                else:
+                    updates["next_attempt_at"] = timezone.now() + retry_delay(attempts, backoff)
+                failed += 1
+            else:
+                updates = {
+                    "attempts": attempts,
+                    "status": OutboxEmail.STATUS_SENT,
+                    "sent_at": timezone.now(),
+                    "last_error": "",
+                }
+                sent += 1
+
+            OutboxEmail.objects.filter(pk=email.pk).update(**updates)
+    finally:
+        connection.close()
+
+    return sent, failed
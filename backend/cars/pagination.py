@@ -0,0 +1,37 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+
+class ReservationCursorPagination(CursorPagination):
+    """
+    Keyset pagination, newest first: pages seek on `created_at` (with `id`
+    as tie-breaker) instead of OFFSET scans and never run COUNT(*).
+    """
+    page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin paginator that takes the row count of an unfiltered changelist
+    from PostgreSQL's planner statistics once the table is large, instead
+    of a COUNT(*) over every row. Filtered lists and other databases count.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.estimate_threshold:
+                return int(row[0])
+        return super().count
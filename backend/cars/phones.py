@@ -0,0 +1,32 @@
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+
+
+# ---------------- PHONE NUMBERS ----------------
+# phonenumbers and its metadata load on the first number, not when the
+# models are imported, so workers and management commands boot faster.
+INVALID_NUMBER = "Invalid phone number."
+INVALID_FORMAT = "Invalid phone number format."
+
+
+@lru_cache(maxsize=2048)
+def _parse(raw):
+    """(E.164 number, None) or (None, error message); invalid input is cached too."""
+    import phonenumbers
+
+    try:
+        parsed = phonenumbers.parse(raw, None)
+    except phonenumbers.NumberParseException:
+        return None, INVALID_FORMAT
+    if not phonenumbers.is_valid_number(parsed):
+        return None, INVALID_NUMBER
+    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164), None
+
+
+def normalize(raw):
+    """Return `raw` in E.164 form or raise ValidationError."""
+    number, error = _parse(raw)
+    if error:
+        raise ValidationError(error)
+    return number
@@ -0,0 +1,116 @@
+from bisect import bisect_right
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+
+ZERO = Decimal("0.00")
+
+
+# ---------------- DAY CALCULATION ----------------
+def rental_days(pickup, dropoff):
+    """Billable days with the 3-hour rule; 0 when the range is missing or empty."""
+    if not pickup or not dropoff or dropoff <= pickup:
+        return 0
+
+    base_days = (dropoff.date() - pickup.date()).days
+
+    # hour difference between pickup hour and dropoff hour
+    time_difference = dropoff - (pickup + timedelta(days=base_days))
+    extra_hours = time_difference.total_seconds() / 3600
+
+    days = base_days + 1 if extra_hours >= 3 else base_days
+
+    # Safety: minimum 1 day
+    return max(days, 1)
+
+
+# ---------------- SEASONAL SEGMENTS ----------------
+def price_segments(periods):
+    """
+    Flatten price periods into sorted, non-overlapping (start, end, price)
+    segments.
+
+    `CarPricePeriod.clean` forbids overlaps, but rows created around it may
+    still overlap; the period with the earliest start date wins, exactly as
+    the original first-match day scan did.
+    """
+    segments = []
+    covered_until = None
+
+    for period in sorted(periods, key=lambda p: p.start_date):
+        start = period.start_date
+        if covered_until is not None and start < covered_until:
+            start = covered_until
+        if start >= period.end_date:
+            continue
+
+        segments.append((start, period.end_date, Decimal(period.price_per_day)))
+        covered_until = period.end_date
+
+    return segments
+
+
+def rate_runs(segments, fallback, start, days):
+    """
+    Yield (first_day, day_count, price) runs covering `days` days from `start`.
+
+    Days without a seasonal period use `fallback`; the price is None when
+    there is no fallback either.
+    """
+    end = start + timedelta(days=days)
+    ends = [segment_end for _, segment_end, _ in segments]
+    idx = bisect_right(ends, start)
+    current = start
+    fallback = Decimal(fallback) if fallback else None
+
+    while current < end:
+        if idx < len(segments) and segments[idx][0] <= current:
+            _, segment_end, price = segments[idx]
+            run_end = min(segment_end, end)
+            idx += 1
+        else:
+            price = fallback
+            run_end = min(segments[idx][0], end) if idx < len(segments) else end
+
+        yield current, (run_end - current).days, price
+        current = run_end
+
+
+def car_total(car, periods, start, days):
+    total = ZERO
+    for first_day, count, price in rate_runs(price_segments(periods), car.price, start, days):
+        if price is None:
+            raise ValidationError(f"No price defined for {first_day}")
+        total += price * count
+    return total
+
+
+def daily_prices(car, periods, start, days):
+    """Effective rate of every day in the range; None where no price is defined."""
+    prices = []
+    for first_day, count, price in rate_runs(price_segments(periods), car.price, start, days):
+        prices.extend((first_day + timedelta(days=offset), price) for offset in range(count))
+    return prices
+
+
+def extras_total(extras, days):
+    total = ZERO
+    for extra in extras or ():
+        try:
+            total += Decimal(str(extra.get("price", 0))) * days
+        except Exception:
+            pass
+    return total
+
+
+# ---------------- QUOTE ----------------
+def quote(car, periods, pickup, dropoff, extras=None):
+    """Return (days, car_total, final_total) for renting `car` over the range."""
+    days = rental_days(pickup, dropoff)
+    if not days:
+        return 0, ZERO, ZERO
+
+    car_price = car_total(car, periods, pickup.date(), days)
+    return days, car_price, car_price + extras_total(extras, days)
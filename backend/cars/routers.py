@@ -0,0 +1,79 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# ---------------- REQUEST STATE ----------------
+# Set per request by ReplicaRoutingMiddleware. Outside a request (commands,
+# background tasks, shell) there is no state and everything uses the primary.
+_state = ContextVar("replica_routing", default=None)
+
+
+class RoutingState:
+    def __init__(self):
+        self.use_replica = False
+        self.pinned = False
+
+
+def begin():
+    return _state.set(RoutingState())
+
+
+def end(token):
+    _state.reset(token)
+
+
+def allow_replica_reads():
+    state = _state.get()
+    if state is not None:
+        state.use_replica = True
+
+
+@contextmanager
+def primary_reads():
+    """
+    Read from the primary inside the block. For results that outlive the
+    request, such as shared cache entries, which must not capture a
+    lagging replica.
+    """
+    state = _state.get()
+    if state is None:
+        yield
+        return
+
+    previous, state.use_replica = state.use_replica, False
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+# ---------------- ROUTER ----------------
+class ReplicaRouter:
+    """
+    Send reads of replica-enabled requests to a random DATABASE_REPLICAS
+    alias. Writes always go to the primary and pin the rest of the request
+    to it, so a request reads its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        replicas = getattr(settings, "DATABASE_REPLICAS", ())
+        if state is None or not state.use_replica or state.pinned or not replicas:
+            return "default"
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
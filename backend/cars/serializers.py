@@ -1,13 +1,19 @@
 from rest_framework import serializers
 from .models import Car, Reservation, CarExtra, Destination, ImgCarExtra,CarPricePeriod
+from .extras import get_extras
+from .images import variant_urls
+from .timing import TimedSerializerMixin
+from datetime import timedelta
+from django.utils import timezone
 import json
 
 class ImgCarExtraSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = ImgCarExtra
-        fields = ("id", "name", "image")
+        fields = ("id", "name", "image", "image_variants")
 
     def get_image(self, obj):
         request = self.context.get("request")
@@ -15,12 +21,16 @@ class ImgCarExtraSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_image_variants(self, obj):
+        return variant_urls(obj, self.context.get("request"))
+
 class CarPricePeriodSerializer(serializers.ModelSerializer):
     class Meta:
         model = CarPricePeriod
         fields = ("id", "start_date", "end_date", "price_per_day")
-class CarSerializer(serializers.ModelSerializer):
+class CarSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     extra_images = ImgCarExtraSerializer(many=True, read_only=True)
     price_periods = CarPricePeriodSerializer(many=True, read_only=True)
 
@@ -31,6 +41,7 @@ class CarSerializer(serializers.ModelSerializer):
             "name",
             "price",
             "image",
+            "image_variants",
             "detail",
             "seats",
             "transmission",
@@ -47,6 +58,9 @@ class CarSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_image_variants(self, obj):
+        return variant_urls(obj, self.context.get("request"))
+
 
 class CarDetailSerializer(serializers.ModelSerializer):
     class Meta:
@@ -54,13 +68,13 @@ class CarDetailSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class DestinationSerializer(serializers.ModelSerializer):
+class DestinationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Destination
         fields = ("id", "name")
 
 
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     driver_licence_front = serializers.ImageField(required=False, allow_null=True)
     driver_licence_back = serializers.ImageField(required=False, allow_null=True)
     passport = serializers.ImageField(required=False, allow_null=True)
@@ -71,7 +85,8 @@ class ReservationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Reservation
-        fields = "__all__"
+        # bookkeeping of the document background task
+        exclude = ("processed_documents",)
         read_only_fields = (
             "status",
             "total_days",
@@ -83,34 +98,133 @@ class ReservationSerializer(serializers.ModelSerializer):
         if not isinstance(value, list):
             return []
 
-        extras_data = []
+        ids = []
         for item in value:
             try:
-                extra = CarExtra.objects.get(id=item.get("id"))
-                extras_data.append({
-                    "id": extra.id,
-                    "name": extra.name,
-                    "price": str(extra.price)
-                })
-            except:
+                ids.append(int(item.get("id")))
+            except (AttributeError, TypeError, ValueError):
                 continue
 
-        return extras_data
+        known = get_extras(ids)
+
+        return [
+            {
+                "id": known[extra_id].id,
+                "name": known[extra_id].name,
+                "price": str(known[extra_id].price)
+            }
+            for extra_id in ids
+            if extra_id in known
+        ]
+
+    def preview_price(self, obj):
+        # both preview fields need the same calculation; do it once per row
+        if not hasattr(obj, "_preview_price"):
+            try:
+                obj._preview_price = obj.calculate_price()
+            except Exception:
+                obj._preview_price = None
+        return obj._preview_price
+
     def get_preview_days(self, obj):
-        try:
-            days, _, _ = obj.calculate_price()
-            return days
-        except:
-            return None
+        price = self.preview_price(obj)
+        return price[0] if price else None
 
     def get_preview_total_price(self, obj):
-        try:
-            _, _, total = obj.calculate_price()
-            return total
-        except:
-            return None
+        price = self.preview_price(obj)
+        return price[2] if price else None
 
-class CarExtraSerializer(serializers.ModelSerializer):
+class CarExtraSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CarExtra
         fields = ("id", "name", "price")
+
+
+class AvailabilitySearchSerializer(serializers.Serializer):
+    pickup = serializers.DateTimeField()
+    return_datetime = serializers.DateTimeField()
+    seats = serializers.IntegerField(required=False, min_value=1)
+    transmission = serializers.ChoiceField(choices=Car.TRANSMISSION_CHOICES, required=False)
+    fuel_type = serializers.CharField(required=False)
+
+    @classmethod
+    def from_query(cls, query_params):
+        # the endpoints take `return`, a keyword in Python
+        data = query_params.dict()
+        if "return" in data:
+            data["return_datetime"] = data.pop("return")
+        return cls(data=data)
+
+    def validate(self, attrs):
+        if attrs["return_datetime"] <= attrs["pickup"]:
+            raise serializers.ValidationError("Return must be after pickup")
+        return attrs
+
+
+class CarAvailabilitySerializer(AvailabilitySearchSerializer):
+    car = serializers.IntegerField()
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    car = serializers.IntegerField()
+    pickup_datetime = serializers.DateTimeField()
+    return_datetime = serializers.DateTimeField()
+    extras = serializers.ListField(child=serializers.JSONField(), required=False, default=list)
+
+    def validate_extras(self, value):
+        # accept [1, 2] as well as the reservation form's [{"id": 1}, ...]
+        ids = []
+        for item in value:
+            extra_id = item.get("id") if isinstance(item, dict) else item
+            try:
+                ids.append(int(extra_id))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+    def validate(self, attrs):
+        if attrs["return_datetime"] <= attrs["pickup_datetime"]:
+            raise serializers.ValidationError("Return must be after pickup")
+        return attrs
+
+
+class QuoteSerializer(TimedSerializerMixin, serializers.Serializer):
+    car = serializers.IntegerField()
+    pickup_datetime = serializers.DateTimeField()
+    return_datetime = serializers.DateTimeField()
+    extras = CarExtraSerializer(many=True)
+    total_days = serializers.IntegerField(allow_null=True)
+    car_price_total = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
+class ReservationFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Reservation.STATUS_CHOICES, required=False)
+    car = serializers.IntegerField(required=False)
+    # reservations overlapping [from, to)
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+
+
+class PriceCalendarQuerySerializer(serializers.Serializer):
+    max_days = 366
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("date_from", timezone.localdate())
+        attrs.setdefault("date_to", attrs["date_from"] + timedelta(days=30))
+
+        days = (attrs["date_to"] - attrs["date_from"]).days + 1
+        if days < 1:
+            raise serializers.ValidationError("'to' must not be before 'from'")
+        if days > self.max_days:
+            raise serializers.ValidationError(f"At most {self.max_days} days per request")
+        return attrs
+
+
+class DailyPriceSerializer(TimedSerializerMixin, serializers.Serializer):
+    date = serializers.DateField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
@@ -1,8 +1,11 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.conf import settings
-from .models import Reservation
+from .models import Car, CarExtra, CarPricePeriod, ImgCarExtra, Reservation
+from . import catalog, extras, occupancy, outbox, tasks
+from .documents import DOCUMENT_FIELDS, process_reservation_documents
+from .images import generate_image_variants
 from decimal import Decimal
 
 
@@ -81,13 +84,7 @@ EXTRAS
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
 
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [settings.BUSINESS_EMAIL],
-        fail_silently=False,
-    )
+    outbox.enqueue(subject, message, [settings.BUSINESS_EMAIL])
 
 
 # ---------------- CUSTOMER EMAIL ----------------
@@ -97,10 +94,13 @@ def notify_customer_approved(sender, instance, **kwargs):
     if not instance.pk:
         return
 
-    previous = Reservation.objects.get(pk=instance.pk)
+    if instance.is_tracked("status"):
+        previous_status = instance.loaded_value("status")
+    else:
+        previous_status = Reservation.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
 
     # ---------- APPROVED ----------
-    if previous.status != Reservation.STATUS_APPROVED and instance.status == Reservation.STATUS_APPROVED:
+    if previous_status != Reservation.STATUS_APPROVED and instance.status == Reservation.STATUS_APPROVED:
 
         if not instance.email:
             return
@@ -149,16 +149,10 @@ Thank you for choosing us.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
 
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [instance.email],
-            fail_silently=False,
-        )
+        outbox.enqueue(subject, message, [instance.email])
 
     # ---------- REJECTED ----------
-    if previous.status != Reservation.STATUS_REJECTED and instance.status == Reservation.STATUS_REJECTED:
+    if previous_status != Reservation.STATUS_REJECTED and instance.status == Reservation.STATUS_REJECTED:
         
         if not instance.email:
             return
@@ -191,10 +185,69 @@ You are welcome to try another date or contact us for assistance.
 Thank you for your understanding.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [instance.email],
-            fail_silently=False,
-        )
\ No newline at end of file
+        outbox.enqueue(subject, message, [instance.email])
+
+
+# ---------------- EXTRAS CACHE ----------------
+@receiver([post_save, post_delete], sender=CarExtra)
+def invalidate_extras_cache(sender, **kwargs):
+    extras.invalidate()
+
+
+# ---------------- CATALOG VERSION ----------------
+@receiver([post_save, post_delete], sender=Car)
+@receiver([post_save, post_delete], sender=ImgCarExtra)
+@receiver([post_save, post_delete], sender=CarPricePeriod)
+def bump_catalog_version(sender, **kwargs):
+    catalog.bump_version()
+
+
+# ---------------- IMAGE VARIANTS ----------------
+@receiver(pre_save, sender=Car)
+@receiver(pre_save, sender=ImgCarExtra)
+def reset_image_variants(sender, instance, **kwargs):
+    if instance.has_changed("image"):
+        instance.image_variants = {}
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_save, sender=ImgCarExtra)
+def schedule_image_variants(sender, instance, **kwargs):
+    if "image" in instance.get_deferred_fields():
+        # saved from .only()/.defer() without touching the image
+        return
+    if instance.image and not instance.image_variants:
+        tasks.submit(generate_image_variants, sender, instance.pk)
+
+
+# ---------------- IDENTITY DOCUMENTS ----------------
+@receiver(post_save, sender=Reservation)
+def schedule_document_processing(sender, instance, **kwargs):
+    fields = [
+        field for field in DOCUMENT_FIELDS
+        if instance.has_changed(field) and getattr(instance, field)
+    ]
+    if fields:
+        tasks.submit(process_reservation_documents, instance.pk, fields)
+
+
+# ---------------- OCCUPANCY CALENDAR ----------------
+@receiver(post_save, sender=Reservation)
+def update_occupancy_on_save(sender, instance, **kwargs):
+    occupancy.reservation_changed(instance)
+
+
+@receiver(post_delete, sender=Reservation)
+def update_occupancy_on_delete(sender, instance, **kwargs):
+    occupancy.reservation_changed(instance, deleted=True)
+
+
+# ---------------- SQLITE PROFILE ----------------
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
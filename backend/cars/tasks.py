@@ -0,0 +1,43 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+            thread_name_prefix="cars-tasks",
+        )
+    return _executor
+
+
+def _run(func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background task %s%r failed", func.__name__, args)
+    finally:
+        close_old_connections()
+
+
+def submit(func, *args):
+    """
+    Run `func(*args)` off the request path once the current transaction
+    commits. BACKGROUND_TASKS_EAGER runs it inline instead (tests, commands).
+    """
+    def schedule():
+        if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+            func(*args)
+        else:
+            _get_executor().submit(_run, func, args)
+
+    transaction.on_commit(schedule)
@@ -1,3 +1,1165 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import json
+import logging
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone as django_timezone
+
+from . import async_views, benchmarks, catalog, documents, extras, occupancy, outbox, phones, pricing, routers, views
+from . import urls as cars_urls
+from .availability import approved_overlapping
+from .middleware import ReplicaRoutingMiddleware
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import Car, CarExtra, CarOccupancy, CarPricePeriod, ImgCarExtra, OutboxEmail, Reservation
+from .pagination import ReservationCursorPagination
+from .serializers import CarSerializer
+
+
+# generous for slow CI machines; django.setup() takes ~0.4 s locally
+IMPORT_BUDGET_SECONDS = 2.0
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def day_scan_total(car, periods, start, days):
+    """The original per-day implementation, kept as the reference."""
+    total = Decimal("0.00")
+    current = start
+    for _ in range(days):
+        period = next(
+            (p for p in periods if p.start_date <= current < p.end_date),
+            None
+        )
+        if period:
+            price = Decimal(period.price_per_day)
+        else:
+            if not car.price:
+                raise ValidationError(f"No price defined for {current}")
+            price = Decimal(car.price)
+        total += price
+        current += timedelta(days=1)
+    return total
+
+
+class PricingEngineTests(SimpleTestCase):
+    def period(self, start, end, price):
+        return SimpleNamespace(start_date=start, end_date=end, price_per_day=Decimal(price))
+
+    def test_three_hour_rule(self):
+        self.assertEqual(pricing.rental_days(utc(2026, 6, 1, 10), utc(2026, 6, 3, 12, 59)), 2)
+        self.assertEqual(pricing.rental_days(utc(2026, 6, 1, 10), utc(2026, 6, 3, 13)), 3)
+        self.assertEqual(pricing.rental_days(utc(2026, 6, 1, 10), utc(2026, 6, 1, 11)), 1)
+        self.assertEqual(pricing.rental_days(utc(2026, 6, 1, 10), utc(2026, 6, 1, 10)), 0)
+        self.assertEqual(pricing.rental_days(None, utc(2026, 6, 1, 10)), 0)
+
+    def test_matches_day_scan(self):
+        rng = random.Random(7)
+        base = date(2026, 1, 1)
+
+        for _ in range(300):
+            periods = []
+            for _ in range(rng.randint(0, 12)):
+                start = base + timedelta(days=rng.randint(0, 300))
+                end = start + timedelta(days=rng.randint(1, 40))
+                periods.append(self.period(start, end, f"{rng.randint(10, 200)}.{rng.randint(0, 99):02d}"))
+            periods.sort(key=lambda p: p.start_date)
+
+            car = SimpleNamespace(price=rng.choice([None, Decimal("55.50")]))
+            start = base + timedelta(days=rng.randint(0, 320))
+            days = rng.randint(1, 90)
+
+            try:
+                expected = day_scan_total(car, periods, start, days)
+            except ValidationError as exc:
+                with self.assertRaisesMessage(ValidationError, exc.messages[0]):
+                    pricing.car_total(car, periods, start, days)
+                continue
+
+            self.assertEqual(pricing.car_total(car, periods, start, days), expected)
+
+    def test_extras_are_charged_per_day(self):
+        car = SimpleNamespace(price=Decimal("40.00"))
+        extras = [{"name": "GPS", "price": "5.00"}, {"name": "broken", "price": "n/a"}]
+
+        days, car_price, total = pricing.quote(car, [], utc(2026, 6, 1, 10), utc(2026, 6, 4, 10), extras)
+
+        self.assertEqual((days, car_price, total), (3, Decimal("120.00"), Decimal("135.00")))
+
+
+class ReservationPriceTests(TestCase):
+    def test_seasonal_periods_and_fallback(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        CarPricePeriod.objects.create(
+            car=car, start_date=date(2026, 7, 1), end_date=date(2026, 7, 3), price_per_day=Decimal("50.00")
+        )
+
+        reservation = Reservation(car=car, pickup_datetime=utc(2026, 6, 30, 9), return_datetime=utc(2026, 7, 4, 9))
+
+        self.assertEqual(reservation.calculate_price(), (4, Decimal("160.00"), Decimal("160.00")))
+
+
+class QuoteAPITests(TestCase):
+    def test_quotes_cost_constant_queries(self):
+        extra = CarExtra.objects.create(name="GPS", price=Decimal("5.00"))
+        cars = [Car.objects.create(name=f"Car {i}", price=Decimal("30.00")) for i in range(20)]
+        for car in cars:
+            CarPricePeriod.objects.create(
+                car=car, start_date=date(2026, 7, 1), end_date=date(2026, 8, 1), price_per_day=Decimal("50.00")
+            )
+
+        body = [
+            {
+                "car": car.id,
+                "pickup_datetime": "2026-06-30T10:00Z",
+                "return_datetime": "2026-07-02T10:00Z",
+                "extras": [extra.id],
+            }
+            for car in cars
+        ]
+
+        with self.assertNumQueries(3):
+            response = self.client.post("/api/quotes/", body, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["total_days"], 2)
+        self.assertEqual(response.json()[0]["car_price_total"], "80.00")
+        self.assertEqual(response.json()[0]["total_price"], "90.00")
+
+
+class ReservationListTests(TestCase):
+    def setUp(self):
+        self.fleet = benchmarks.make_fleet(3, periods_per_car=3)
+        benchmarks.make_reservations(self.fleet, 30, pending_share=0.4)
+        # bulk inserts share timestamps; make the ties explicit
+        for index, pk in enumerate(Reservation.objects.order_by("id").values_list("pk", flat=True)):
+            Reservation.objects.filter(pk=pk).update(created_at=utc(2026, 1, 1 + index % 3))
+
+    def listed(self, **params):
+        response = self.client.get("/api/reservations/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_cursor_pages_have_no_duplicates_or_gaps(self):
+        expected = list(Reservation.objects.order_by("-created_at", "-id").values_list("pk", flat=True))
+
+        seen, pages, url = [], 0, "/api/reservations/"
+        with mock.patch.object(ReservationCursorPagination, "page_size", 4):
+            while url:
+                data = self.client.get(url).json()
+                seen += [row["id"] for row in data["results"]]
+                pages += 1
+                url = data["next"]
+
+            # and back again from the last page
+            previous = data["previous"]
+            self.assertEqual([row["id"] for row in self.client.get(previous).json()["results"]], expected[-8:-4])
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 8)
+
+    def test_filters(self):
+        car = self.fleet[1]
+        window = (utc(2024, 3, 1), utc(2024, 4, 1))
+
+        for params, queryset in [
+            ({"status": "pending"}, Reservation.objects.filter(status="pending")),
+            ({"car": car.pk}, Reservation.objects.filter(car=car)),
+            (
+                {"from": window[0].isoformat(), "to": window[1].isoformat()},
+                Reservation.objects.filter(return_datetime__gt=window[0], pickup_datetime__lt=window[1]),
+            ),
+            (
+                {"status": "approved", "car": car.pk, "from": window[0].isoformat()},
+                Reservation.objects.filter(status="approved", car=car, return_datetime__gt=window[0]),
+            ),
+        ]:
+            with self.subTest(params=params):
+                expected = list(queryset.order_by("-created_at", "-id").values_list("pk", flat=True))
+                self.assertTrue(expected)
+                self.assertEqual(self.listed(**params), expected)
+
+        for params in ({"status": "lost"}, {"car": "golf"}, {"from": "yesterday"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/reservations/", params).status_code, 400)
+
+    def test_listing_does_not_query_per_row(self):
+        # the reservations, then the price periods of all their cars
+        with self.assertNumQueries(2):
+            data = self.client.get("/api/reservations/").json()
+
+        self.assertEqual(len(data["results"]), 30)
+        self.assertTrue(all(row["preview_total_price"] for row in data["results"]))
+
+
+class AvailabilityAPITests(TestCase):
+    def setUp(self):
+        self.golf = Car.objects.create(name="Golf", seats=5, transmission="manual", fuel_type="Diesel")
+        self.polo = Car.objects.create(name="Polo", seats=4, transmission="automatic", fuel_type="Petrol")
+        self.sharan = Car.objects.create(name="Sharan", seats=7, transmission="automatic", fuel_type="Diesel")
+
+        # bulk_create skips the overlap validation, so approved bookings may overlap
+        Reservation.objects.bulk_create([
+            Reservation(car=self.golf, status=Reservation.STATUS_APPROVED,
+                        pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 10, 10)),
+            Reservation(car=self.golf, status=Reservation.STATUS_APPROVED,
+                        pickup_datetime=utc(2026, 6, 2, 10), return_datetime=utc(2026, 6, 3, 10)),
+            Reservation(car=self.polo, status=Reservation.STATUS_PENDING,
+                        pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 10, 10)),
+        ])
+
+    def available(self, **params):
+        response = self.client.get("/api/cars/available/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [car["name"] for car in response.json()]
+
+    def test_fleet_search(self):
+        window = {"pickup": "2026-06-05T10:00:00Z", "return": "2026-06-06T10:00:00Z"}
+
+        # only approved reservations block a car
+        self.assertEqual(self.available(**window), ["Polo", "Sharan"])
+        # back to back with the long booking
+        self.assertEqual(
+            self.available(pickup="2026-06-10T10:00:00Z", **{"return": "2026-06-12T10:00:00Z"}),
+            ["Golf", "Polo", "Sharan"],
+        )
+
+        self.assertEqual(self.available(**window, seats=5), ["Sharan"])
+        self.assertEqual(self.available(**window, transmission="automatic"), ["Polo", "Sharan"])
+        self.assertEqual(self.available(**window, fuel_type="diesel"), ["Sharan"])
+
+    def test_car_availability(self):
+        def check(car, pickup, dropoff):
+            response = self.client.get(
+                "/api/cars/availability/", {"car": car.pk, "pickup": pickup, "return": dropoff}
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            return response.json()["available"]
+
+        self.assertFalse(check(self.golf, "2026-06-05T10:00:00Z", "2026-06-06T10:00:00Z"))
+        self.assertTrue(check(self.golf, "2026-06-10T10:00:00Z", "2026-06-12T10:00:00Z"))
+        self.assertTrue(check(self.polo, "2026-06-05T10:00:00Z", "2026-06-06T10:00:00Z"))
+
+    def test_invalid_parameters_are_rejected(self):
+        window = {"pickup": "2026-06-05T10:00:00Z", "return": "2026-06-06T10:00:00Z"}
+
+        for path, params, field in [
+            ("/api/cars/available/", {}, "pickup"),
+            ("/api/cars/available/", {**window, "pickup": "bad"}, "pickup"),
+            ("/api/cars/available/", {**window, "return": "2026-06-01T10:00:00Z"}, "non_field_errors"),
+            ("/api/cars/available/", {**window, "seats": "0"}, "seats"),
+            ("/api/cars/availability/", {}, "car"),
+            ("/api/cars/availability/", window, "car"),
+            ("/api/cars/availability/", {**window, "car": self.golf.pk, "pickup": "bad"}, "pickup"),
+        ]:
+            with self.subTest(path=path, params=params):
+                response = self.client.get(path, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("SMTP is down")
+
+
+class TransactionRecordingBackend(BaseEmailBackend):
+    """Records how many atomic blocks are open on the default connection per send."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.depths = []
+
+    def send_messages(self, email_messages):
+        self.depths.append(len(connection.atomic_blocks))
+        return len(email_messages)
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+
+    def reserve(self, **kwargs):
+        return Reservation.objects.create(
+            car=self.car,
+            email="customer@example.com",
+            pickup_datetime=utc(2026, 6, 1, 10),
+            return_datetime=utc(2026, 6, 3, 10),
+            **kwargs,
+        )
+
+    def test_signals_write_to_outbox_instead_of_sending(self):
+        reservation = self.reserve()
+        reservation.status = Reservation.STATUS_APPROVED
+        reservation.save()
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            list(OutboxEmail.objects.values_list("recipients", flat=True)),
+            [[settings.BUSINESS_EMAIL], ["customer@example.com"]],
+        )
+
+    def test_drain_sends_due_emails_once(self):
+        self.reserve()
+
+        self.assertEqual(outbox.drain(), (1, 0))
+        self.assertEqual(outbox.drain(), (0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertTrue(mail.outbox[0].subject.startswith("New Reservation #"))
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.STATUS_SENT)
+
+    def test_failures_back_off_and_give_up(self):
+        email = outbox.enqueue("Hi", "Body", ["a@example.com"])
+
+        self.assertEqual(outbox.drain(max_attempts=2, connection=FailingEmailBackend()), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.STATUS_PENDING, 1))
+        self.assertGreater(email.next_attempt_at, django_timezone.now())
+        self.assertIn("SMTP is down", email.last_error)
+
+        # not due yet
+        self.assertEqual(outbox.drain(connection=FailingEmailBackend()), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=django_timezone.now())
+        outbox.drain(max_attempts=2, connection=FailingEmailBackend())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.STATUS_FAILED, 2))
+
+    def test_sends_outside_the_claiming_transaction(self):
+        outbox.enqueue("Hi", "Body", ["a@example.com"])
+        outbox.enqueue("Hello", "Body", ["b@example.com"])
+        backend = TransactionRecordingBackend()
+        depth = len(connection.atomic_blocks)
+
+        self.assertEqual(outbox.drain(connection=backend), (2, 0))
+        self.assertEqual(backend.depths, [depth, depth])
+
+    def test_claimed_batch_is_leased(self):
+        email = outbox.enqueue("Hi", "Body", ["a@example.com"])
+
+        self.assertEqual(outbox.claim(batch_size=10, lease=600), [email])
+        # another worker finds nothing due until the lease lapses
+        self.assertEqual(outbox.claim(batch_size=10, lease=600), [])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.STATUS_PENDING)
+        self.assertGreater(email.next_attempt_at, django_timezone.now() + timedelta(seconds=590))
+
+
+class ChangeTrackingTests(TestCase):
+    def test_status_transition_does_not_reread_the_row(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        Reservation.objects.create(
+            car=car, email="customer@example.com",
+            pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 3, 10),
+        )
+
+        reservation = Reservation.objects.select_related("car").get()
+        self.assertEqual(reservation.dirty_fields(), [])
+
+        reservation.status = Reservation.STATUS_APPROVED
+        self.assertEqual(reservation.dirty_fields(), ["status"])
+
+        with CaptureQueriesContext(connection) as queries:
+            reservation.save()
+
+        rereads = [
+            q["sql"] for q in queries
+            if re.search(r'FROM "cars_reservation" WHERE "cars_reservation"."id" = \d+ (ORDER BY|LIMIT)', q["sql"])
+        ]
+        self.assertEqual(rereads, [])
+        self.assertEqual(OutboxEmail.objects.filter(subject__startswith="Reservation Confirmed").count(), 1)
+        self.assertFalse(reservation.has_changed("status"))
+
+    def test_refresh_updates_the_loaded_values(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        Reservation.objects.create(
+            car=car, email="customer@example.com", phone_number="+355 69 123 4567",
+            pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 3, 10),
+        )
+        reservation = Reservation.objects.get()
+        Reservation.objects.get().approve()
+        confirmations = OutboxEmail.objects.filter(subject__startswith="Reservation Confirmed")
+        self.assertEqual(confirmations.count(), 1)
+
+        reservation.refresh_from_db()
+        self.assertFalse(reservation.has_changed("status"))
+        self.assertEqual(reservation.loaded_value("status"), Reservation.STATUS_APPROVED)
+
+        reservation.name_surname = "Zana Hoxha"
+        reservation.save()
+        self.assertEqual(confirmations.count(), 1)
+
+        # deferred fields are remembered when first read
+        partial = Reservation.objects.only("id", "status", "car_id").get()
+        self.assertEqual(partial.phone_number, reservation.phone_number)
+        self.assertFalse(partial.has_changed("phone_number"))
+        self.assertEqual(partial.dirty_fields(), [])
+
+    def test_deferred_fields_are_not_loaded(self):
+        Car.objects.create(name="Golf", price=Decimal("30.00"))
+        car = Car.objects.only("name").get()
+        car.name = "Golf GTI"
+
+        self.assertEqual(car.dirty_fields(), ["name"])
+        with CaptureQueriesContext(connection) as queries:
+            car.save()
+
+        self.assertEqual([q["sql"].split()[0] for q in queries], ["UPDATE"])
+        self.assertEqual(car.get_deferred_fields(), {
+            field.attname for field in Car._meta.concrete_fields if field.name not in ("id", "name")
+        })
+        self.assertEqual(car.dirty_fields(), [])
+
+
+class ReservationExtrasTests(TestCase):
+    def setUp(self):
+        self.car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        benchmarks.make_extras(10)
+        self.extras = list(CarExtra.objects.order_by("id"))
+        extras.invalidate()
+        self.addCleanup(extras.invalidate)
+
+    def reserve(self, extra_ids, day):
+        # both runs load the extras cache once
+        extras.invalidate()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post("/api/reservations/", {
+                "car": self.car.pk,
+                "email": "customer@example.com",
+                "pickup_datetime": f"2026-06-{day:02d}T10:00Z",
+                "return_datetime": f"2026-06-{day + 2:02d}T10:00Z",
+                "extras": json.dumps([{"id": extra_id} for extra_id in extra_ids]),
+            })
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json(), len(captured)
+
+    def test_creation_queries_do_not_depend_on_extras(self):
+        _, without = self.reserve([], day=1)
+        data, with_extras = self.reserve([extra.pk for extra in self.extras], day=5)
+        self.assertEqual(with_extras, without)
+        self.assertEqual(
+            data["extras"],
+            [{"id": extra.pk, "name": extra.name, "price": str(extra.price)} for extra in self.extras],
+        )
+
+        # ids missing from the cache are looked up together, then dropped if unknown
+        data, with_unknown = self.reserve([self.extras[0].pk, 0, 10_000, 20_000], day=10)
+        self.assertEqual(with_unknown, without + 1)
+        self.assertEqual([extra["id"] for extra in data["extras"]], [self.extras[0].pk])
+
+    def test_saving_or_deleting_an_extra_invalidates_the_cache(self):
+        def listed():
+            return {row["name"]: row["price"] for row in self.client.get("/api/car-extras/").json()["results"]}
+
+        self.assertEqual(len(listed()), 10)
+        with self.assertNumQueries(0):
+            listed()
+
+        gps = CarExtra.objects.create(name="GPS", price=Decimal("5.00"))
+        self.assertEqual(listed()["GPS"], "5.00")
+
+        gps.price = Decimal("7.50")
+        gps.save()
+        self.assertEqual(listed()["GPS"], "7.50")
+
+        gps.delete()
+        self.assertNotIn("GPS", listed())
+
+
+class CatalogCacheTests(TestCase):
+    def test_conditional_get_and_invalidation(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+
+        first = self.client.get("/api/cars/")
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/cars/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        CarPricePeriod.objects.create(
+            car=car, start_date=date(2026, 7, 1), end_date=date(2026, 8, 1), price_per_day=Decimal("50.00")
+        )
+
+        changed = self.client.get("/api/cars/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(len(changed.json()["results"][0]["price_periods"]), 1)
+
+
+def jpeg_upload(name="photo.jpg", size=(2400, 1600), orientation=None):
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class MediaTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, BACKGROUND_TASKS_EAGER=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ImageVariantTests(MediaTestCase):
+    def test_upload_builds_webp_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            car = Car.objects.create(name="Golf", price=Decimal("30.00"), image=jpeg_upload())
+
+        car.refresh_from_db()
+        self.assertEqual(set(car.image_variants), {"thumbnail", "card", "full"})
+        with car.image.storage.open(car.image_variants["thumbnail"]) as stored:
+            thumbnail = Image.open(stored)
+            self.assertEqual((thumbnail.format, thumbnail.size), ("WEBP", (320, 213)))
+
+        data = self.client.get(f"/api/cars/{car.pk}/").json()
+        self.assertTrue(data["image_variants"]["card"].endswith("_card.webp"))
+
+
+class DocumentProcessingTests(MediaTestCase):
+    def test_uploaded_documents_are_downscaled_and_stripped(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/reservations/", {
+                "car": car.pk,
+                "pickup_datetime": "2026-06-01T10:00Z",
+                "return_datetime": "2026-06-03T10:00Z",
+                # taken in portrait: stored landscape with an EXIF rotation
+                "passport": jpeg_upload("passport.jpeg", size=(4000, 3000), orientation=6),
+            })
+        self.assertEqual(response.status_code, 201)
+
+        passport = Reservation.objects.get().passport
+        self.assertTrue(passport.name.endswith(".jpg"))
+        with passport.storage.open(passport.name) as stored:
+            image = Image.open(stored)
+            self.assertEqual(image.size, (1500, 2000))
+            self.assertNotIn("exif", image.info)
+        # the original upload is removed once the row points at the new file
+        self.assertEqual(passport.storage.listdir("passports")[1], [passport.name.split("/")[-1]])
+
+    def test_command_processes_documents_the_worker_missed(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        # the on-commit task never runs, as if the worker restarted first
+        reservation = Reservation.objects.create(
+            car=car, email="customer@example.com",
+            pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 3, 10),
+            passport=jpeg_upload("passport.png", size=(3000, 2000)),
+        )
+        Reservation.objects.create(
+            car=car, email="other@example.com",
+            pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 3, 10),
+        )
+
+        output = StringIO()
+        call_command("process_documents", stdout=output)
+        self.assertEqual(output.getvalue(), f"Reservation #{reservation.pk}: passport\n")
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.processed_documents, {"passport": reservation.passport.name})
+        self.assertEqual(reservation.passport.storage.listdir("passports")[1], ["passport.jpg"])
+        with reservation.passport.open() as stored:
+            self.assertEqual(Image.open(stored).size, (2000, 1333))
+
+        # nothing left to do
+        output = StringIO()
+        call_command("process_documents", stdout=output)
+        self.assertEqual(output.getvalue(), "")
+
+    def test_document_replaced_while_processing_is_kept(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        reservation = Reservation.objects.create(
+            car=car, email="customer@example.com",
+            pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 3, 10),
+            passport=jpeg_upload("old.png"),
+        )
+        original = reservation.passport.name
+        storage = reservation.passport.storage
+        replacement = storage.save("passports/replacement.jpg", jpeg_upload())
+        normalize = documents.normalize_document
+
+        def replace_then_normalize(name):
+            Reservation.objects.filter(pk=reservation.pk).update(passport=replacement)
+            return normalize(name)
+
+        with mock.patch.object(documents, "normalize_document", replace_then_normalize):
+            documents.process_reservation_documents(reservation.pk, fields=["passport"])
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.passport.name, replacement)
+        # the processed copy of the old upload is discarded, the old upload is left alone
+        self.assertEqual(sorted(storage.listdir("passports")[1]), sorted(["old.png", "replacement.jpg"]))
+        self.assertEqual(original, "passports/old.png")
+
+
+@unittest.skipUnless(connection.vendor in ("sqlite", "postgresql"), "EXPLAIN format is backend specific")
+class QueryPlanTests(TestCase):
+    """The booking hot paths must be answered from their composite indexes."""
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # tiny test tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_single_car_overlap_check(self):
+        queryset = approved_overlapping(utc(2026, 6, 1), utc(2026, 6, 5)).filter(car_id=1)
+        self.assertUsesIndex(queryset.values_list("pk")[:1], "reservation_overlap_idx")
+
+    def test_fleet_window_scan(self):
+        busy = approved_overlapping(utc(2026, 6, 1), utc(2026, 6, 5)).values("car_id")
+        self.assertUsesIndex(Car.objects.exclude(pk__in=busy).values("id"), "reservation_window_idx")
+
+    def test_price_period_overlap_check(self):
+        queryset = CarPricePeriod.objects.filter(
+            car_id=1, start_date__lt=date(2026, 8, 1), end_date__gt=date(2026, 7, 1)
+        ).exclude(pk=5)
+        self.assertUsesIndex(queryset.values_list("pk")[:1], "price_period_range_idx")
+
+
+class DoubleBookingStressTests(TransactionTestCase):
+    threads = 8
+    rounds = 5
+
+    def approve_concurrently(self, reservations):
+        barrier = threading.Barrier(len(reservations))
+        outcomes = []
+
+        def approve(pk):
+            try:
+                reservation = Reservation.objects.get(pk=pk)
+                barrier.wait()
+                reservation.approve()
+                outcomes.append("approved")
+            except ValidationError:
+                outcomes.append("conflict")
+            except DatabaseError:
+                # lock wait timed out
+                outcomes.append("locked")
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=approve, args=(r.pk,)) for r in reservations]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return outcomes
+
+    def test_concurrent_approvals_never_double_book(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        attempts, started = 0, time.perf_counter()
+
+        for round_ in range(self.rounds):
+            pickup = utc(2026, 6, 1) + timedelta(days=10 * round_)
+            reservations = [
+                Reservation.objects.create(
+                    car=car,
+                    pickup_datetime=pickup + timedelta(hours=i),
+                    return_datetime=pickup + timedelta(days=3, hours=i),
+                )
+                for i in range(self.threads)
+            ]
+
+            outcomes = self.approve_concurrently(reservations)
+            attempts += len(outcomes)
+
+            # every loser waited for the car lock, then failed the overlap re-check
+            self.assertEqual(sorted(outcomes), ["approved"] + ["conflict"] * (self.threads - 1))
+            approved = Reservation.objects.filter(
+                pk__in=[r.pk for r in reservations], status=Reservation.STATUS_APPROVED
+            ).count()
+            self.assertEqual(approved, 1)
+
+        elapsed = time.perf_counter() - started
+        logging.getLogger(__name__).info(
+            "%d contended approvals in %.2fs (%.0f/s)", attempts, elapsed, attempts / elapsed
+        )
+
+
+class OccupancyCalendarTests(TestCase):
+    def test_bitmap_follows_approval_changes(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        reservation = Reservation.objects.create(
+            car=car, pickup_datetime=utc(2026, 6, 29, 10), return_datetime=utc(2026, 7, 2, 0)
+        )
+
+        self.assertEqual(self.client.get(f"/api/cars/{car.pk}/calendar/?month=2026-06").json()["occupied_days"], [])
+
+        reservation.approve()
+        with self.assertNumQueries(1):
+            june = self.client.get(f"/api/cars/{car.pk}/calendar/?month=2026-06").json()
+        self.assertEqual(june["occupied_days"], [29, 30])
+        # returning at midnight leaves July 2nd free
+        july = self.client.get("/api/cars/calendar/?month=2026-07").json()
+        self.assertEqual(july["cars"], [{"car": car.pk, "bitmap": 0b1, "occupied_days": [1]}])
+
+        reservation.pickup_datetime = utc(2026, 7, 1, 10)
+        reservation.save()
+        self.assertEqual(self.client.get(f"/api/cars/{car.pk}/calendar/?month=2026-06").json()["occupied_days"], [])
+
+        reservation.delete()
+        self.assertFalse(car.occupancy.exists())
+
+    def test_backfill_matches_the_signal_maintained_bitmaps(self):
+        fleet = benchmarks.make_fleet(3)
+        for reservation in benchmarks.make_reservations(fleet, 40, pending_share=0.3):
+            if reservation.status == Reservation.STATUS_APPROVED:
+                # bulk_create skipped the signals, so drive them one by one
+                occupancy.reservation_changed(reservation)
+        expected = set(CarOccupancy.objects.values_list("car_id", "month", "days"))
+        self.assertTrue(expected)
+
+        backfill = importlib.import_module("cars.migrations.0014_backfill_occupancy")
+        CarOccupancy.objects.all().delete()
+        backfill.backfill_occupancy(django_apps, None)
+        self.assertEqual(set(CarOccupancy.objects.values_list("car_id", "month", "days")), expected)
+
+        call_command("rebuild_occupancy", stdout=StringIO())
+        self.assertEqual(set(CarOccupancy.objects.values_list("car_id", "month", "days")), expected)
+
+
+class PriceCalendarTests(TestCase):
+    def test_days_resolve_to_seasonal_or_fallback_rate(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        CarPricePeriod.objects.create(
+            car=car, start_date=date(2026, 7, 2), end_date=date(2026, 7, 4), price_per_day=Decimal("50.00")
+        )
+
+        url = f"/api/cars/{car.pk}/prices/?from=2026-07-01&to=2026-07-04"
+        response = self.client.get(url)
+        self.assertEqual(
+            [(day["date"], day["price"]) for day in response.json()["days"]],
+            [("2026-07-01", "30.00"), ("2026-07-02", "50.00"), ("2026-07-03", "50.00"), ("2026-07-04", "30.00")],
+        )
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        car.price = None
+        car.save()
+        self.assertIsNone(self.client.get(url).json()["days"][0]["price"])
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_cases_run_on_small_data(self):
+        results = benchmarks.bench_serialization(repeat=1, sizes=(3,)) + benchmarks.bench_reservations(
+            repeat=1, extras_per_reservation=(2,)
+        )
+
+        self.assertEqual([r["name"] for r in results], [
+            "CarSerializer", "catalog.serialize_cars", "ReservationSerializer.validate_extras", "reservation create",
+        ])
+        # catalog serialization must not grow with the fleet
+        self.assertEqual(results[0]["queries"], 3)
+        self.assertEqual(results[1]["queries"], 3)
+
+
+@override_settings(
+    MIDDLEWARE=["cars.middleware.RequestTimingMiddleware"] + settings.MIDDLEWARE,
+    REQUEST_QUERY_BUDGET=20,
+)
+class RequestTimingTests(TestCase):
+    def test_server_timing_and_log(self):
+        Car.objects.create(name="Golf", price=Decimal("30.00"))
+
+        with self.assertLogs("cars.requests", "INFO") as logs:
+            response = self.client.get("/api/cars/")
+
+        timings = dict(
+            re.match(r"(\w+);dur=([\d.]+)", entry.strip()).groups()
+            for entry in response["Server-Timing"].split(",")
+        )
+        self.assertEqual(set(timings), {"db", "serialize", "view", "render", "total"})
+        self.assertIn('desc="4 queries"', response["Server-Timing"])
+        self.assertEqual(logs.records[0].timing["queries"], 4)
+        self.assertEqual(logs.records[0].levelname, "INFO")
+
+    @mock.patch.object(views.ReservationCreateAPIView, "query_budget", 1)
+    def test_query_budget_warning(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        for day in range(3):
+            Reservation.objects.create(
+                car=car, name_surname="A", email="a@example.com",
+                pickup_datetime=utc(2026, 6, 1 + day * 3, 10), return_datetime=utc(2026, 6, 2 + day * 3, 10),
+            )
+
+        with self.assertLogs("cars.requests", "WARNING") as logs:
+            self.client.get("/api/reservations/")
+
+        self.assertIn("query budget exceeded", logs.output[0])
+        self.assertGreater(logs.records[0].timing["queries"], 1)
+
+
+class RequestProfilerTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_ring_buffer_and_report(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        Reservation.objects.create(
+            car=car, name_surname="A", email="a@example.com",
+            pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 3, 10),
+        )
+
+        with override_settings(
+            MIDDLEWARE=["cars.middleware.RequestProfilerMiddleware"] + settings.MIDDLEWARE,
+            REQUEST_PROFILING_RATE=0, REQUEST_PROFILING_TOKEN="secret",
+            REQUEST_PROFILING_DIR=self.directory, REQUEST_PROFILING_KEEP=2,
+        ):
+            self.assertNotIn("X-Profile-Id", self.client.get("/api/reservations/"))
+            ids = [
+                self.client.get("/api/reservations/", HTTP_X_PROFILE="secret")["X-Profile-Id"]
+                for _ in range(3)
+            ]
+
+            self.assertEqual(sorted(p.name for p in Path(self.directory).iterdir()), ids[1:])
+
+            out = StringIO()
+            call_command("profile_report", "--filter", "cars", "--path", "api-reservations", stdout=out)
+        self.assertIn("2 profile(s)", out.getvalue())
+        self.assertIn("calculate_price", out.getvalue())
+
+
+class LeanCatalogTests(TestCase):
+    def test_matches_car_serializer(self):
+        fleet = benchmarks.make_fleet(3, periods_per_car=3, images_per_car=2)
+        Car.objects.filter(pk=fleet[0].pk).update(
+            image_variants={"card": "cars/bench_0_card.webp"}, price=None, image="",
+        )
+        ImgCarExtra.objects.filter(car=fleet[1]).update(image_variants={"thumbnail": "cars/extras/a b.webp"})
+        Car.objects.create(name=None)
+
+        request = RequestFactory().get("/api/cars/", HTTP_HOST="cars.example.com")
+        reference = CarSerializer(
+            Car.objects.prefetch_related("extra_images", "price_periods").order_by("id"),
+            many=True, context={"request": request},
+        ).data
+        lean = catalog.serialize_cars(list(Car.objects.order_by("id").values(*catalog.CAR_FIELDS)), request)
+
+        self.assertEqual(JSONRenderer().render(lean), JSONRenderer().render(reference))
+        self.assertEqual(catalog.serialize_cars([], request), [])
+
+    def test_list_endpoint(self):
+        benchmarks.make_fleet(2)
+
+        with self.assertNumQueries(4):
+            data = self.client.get("/api/cars/").json()
+
+        self.assertEqual(data["count"], 2)
+        self.assertTrue(data["results"][0]["extra_images"][0]["image"].startswith("http://testserver/media/"))
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every view in cars/views.py declares a `query_budget`; requests must
+    stay within it at 1, 10 and 100 related rows, which rules out N+1s.
+    """
+
+    def endpoints(self, car, extra_ids):
+        pickup, dropoff = "2024-03-01T10:00:00Z", "2024-03-05T10:00:00Z"
+        reservation = {
+            "car": car,
+            "name_surname": "Budget Test",
+            "email": "budget@example.com",
+            "pickup_datetime": "2031-01-01T10:00:00Z",
+            "return_datetime": "2031-01-04T10:00:00Z",
+            "extras": json.dumps([{"id": extra_id} for extra_id in extra_ids]),
+        }
+        quotes = [
+            {"car": car, "pickup_datetime": pickup, "return_datetime": dropoff, "extras": extra_ids}
+            for _ in range(len(extra_ids))
+        ]
+        return [
+            (views.CarListAPIView, "get", "/api/cars/", {}),
+            (views.CarDetailAPIView, "get", f"/api/cars/{car}/", {}),
+            (views.CarAvailabilityAPIView, "get", "/api/cars/availability/",
+             {"data": {"car": car, "pickup": pickup, "return": dropoff}}),
+            (views.FleetAvailabilityAPIView, "get", "/api/cars/available/",
+             {"data": {"pickup": pickup, "return": dropoff}}),
+            (views.FleetCalendarAPIView, "get", "/api/cars/calendar/", {"data": {"month": "2024-03"}}),
+            (views.CarCalendarAPIView, "get", f"/api/cars/{car}/calendar/", {"data": {"month": "2024-03"}}),
+            (views.CarPriceCalendarAPIView, "get", f"/api/cars/{car}/prices/",
+             {"data": {"from": "2026-01-01", "to": "2026-12-31"}}),
+            (views.CarExtraListAPIView, "get", "/api/car-extras/", {}),
+            (views.DestinationListAPIView, "get", "/api/destination/", {}),
+            (views.ReservationCreateAPIView, "get", "/api/reservations/", {}),
+            (views.ReservationCreateAPIView, "post", "/api/reservations/", {"data": reservation}),
+            (views.QuoteAPIView, "post", "/api/quotes/", {"data": quotes, "content_type": "application/json"}),
+            (async_views.AsyncCarListView, "get", "/api/async/cars/", {}),
+            (async_views.AsyncCarDetailView, "get", f"/api/async/cars/{car}/", {}),
+            (async_views.AsyncCarAvailabilityView, "get", "/api/async/cars/availability/",
+             {"data": {"car": car, "pickup": pickup, "return": dropoff}}),
+            (async_views.AsyncCarExtraListView, "get", "/api/async/car-extras/", {}),
+            (async_views.AsyncDestinationListView, "get", "/api/async/destination/", {}),
+        ]
+
+    def test_every_view_declares_a_budget(self):
+        routed = {pattern.callback.view_class for pattern in cars_urls.urlpatterns}
+        covered = {view for view, *_ in self.endpoints(1, [])}
+
+        self.assertEqual(routed - covered, set(), "add the view to QueryBudgetTests.endpoints")
+        for view in routed:
+            self.assertIsInstance(getattr(view, "query_budget", None), int, view.__name__)
+
+    def assert_within_budgets(self, size):
+        fleet = benchmarks.make_fleet(size, periods_per_car=size, images_per_car=size)
+        extra_ids = [extra.pk for extra in benchmarks.make_extras(size)]
+        benchmarks.make_destinations(size)
+        benchmarks.make_reservations(fleet, size * 3, pending_share=0.3)
+        call_command("rebuild_occupancy", stdout=StringIO())
+
+        for view, method, url, kwargs in self.endpoints(fleet[0].pk, extra_ids):
+            # measure the uncached path of the catalog views
+            cache.clear()
+            extras.invalidate()
+            with self.subTest(view=view.__name__, method=method, rows=size):
+                with CaptureQueriesContext(connection) as captured:
+                    response = getattr(self.client, method)(url, **kwargs)
+                self.assertLess(response.status_code, 300, response.content[:200])
+                self.assertLessEqual(
+                    len(captured), view.query_budget,
+                    "\n".join(query["sql"] for query in captured.captured_queries),
+                )
+
+    def test_one_row(self):
+        self.assert_within_budgets(1)
+
+    def test_ten_rows(self):
+        self.assert_within_budgets(10)
+
+    def test_hundred_rows(self):
+        self.assert_within_budgets(100)
+
+
+class AsyncEndpointTests(TestCase):
+    def test_same_json_as_drf_views(self):
+        fleet = benchmarks.make_fleet(3)
+        benchmarks.make_extras(2)
+        benchmarks.make_destinations(2)
+        benchmarks.make_reservations(fleet, 5)
+        car = fleet[0].pk
+        window = {"car": car, "pickup": "2024-01-01T00:00:00Z", "return": "2024-03-01T00:00:00Z"}
+
+        for path, params in [
+            ("cars/", {}),
+            ("cars/", {"page": 2}),
+            (f"cars/{car}/", {}),
+            ("cars/0/", {}),
+            ("cars/availability/", window),
+            ("cars/availability/", {**window, "pickup": "2030-01-01T00:00:00Z", "return": "2030-01-02T00:00:00Z"}),
+            ("cars/availability/", {}),
+            ("cars/availability/", {**window, "pickup": "bad"}),
+            ("car-extras/", {}),
+            ("destination/", {}),
+        ]:
+            with self.subTest(path=path, params=params):
+                cache.clear()
+                expected = self.client.get(f"/api/{path}", params)
+                actual = self.client.get(f"/api/async/{path}", params)
+
+                self.assertEqual(actual.status_code, expected.status_code)
+                self.assertEqual(actual.content, expected.content)
+                self.assertEqual(actual.get("ETag"), expected.get("ETag"))
+
+    def test_conditional_get(self):
+        benchmarks.make_fleet(1)
+        etag = self.client.get("/api/async/cars/")["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/async/cars/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "SQLite profile")
+class SQLiteProfileTests(TestCase):
+    def test_pragmas_applied_on_connect(self):
+        with connection.cursor() as cursor:
+            # the test database is a file (TEST NAME), so WAL and mmap apply too
+            for pragma, expected in [
+                ("journal_mode", "wal"),
+                ("synchronous", 1),
+                ("mmap_size", settings.SQLITE_PRAGMAS["mmap_size"]),
+                ("busy_timeout", 5000),
+            ]:
+                cursor.execute(f"PRAGMA {pragma}")
+                self.assertEqual(cursor.fetchone()[0], expected, pragma)
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRoutingTests(SimpleTestCase):
+    router = routers.ReplicaRouter()
+
+    def route(self, view_class, method="get"):
+        request = getattr(RequestFactory(), method)("/")
+
+        def get_response(request):
+            middleware.process_view(request, view_class.as_view(), (), {})
+            return self.router.db_for_read(Car)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(request)
+
+    def test_views_opt_in(self):
+        self.assertEqual(self.route(views.CarListAPIView), "replica1")
+        self.assertEqual(self.route(async_views.AsyncCarDetailView), "replica1")
+        self.assertEqual(self.route(views.CarListAPIView, "post"), "default")
+        self.assertEqual(self.route(views.ReservationCreateAPIView), "default")
+        # outside a request: commands, background tasks
+        self.assertEqual(self.router.db_for_read(Car), "default")
+
+    def test_writes_pin_the_request_to_the_primary(self):
+        token = routers.begin()
+        try:
+            routers.allow_replica_reads()
+            self.assertEqual(self.router.db_for_read(Car), "replica1")
+            self.assertEqual(self.router.db_for_write(Reservation), "default")
+            self.assertEqual(self.router.db_for_read(Reservation), "default")
+        finally:
+            routers.end(token)
+
+        self.assertTrue(self.router.allow_migrate("default", "cars"))
+        self.assertFalse(self.router.allow_migrate("replica1", "cars"))
+
+    def test_catalog_cache_is_filled_from_the_primary(self):
+        reads = []
+
+        def read(*args, **kwargs):
+            reads.append(self.router.db_for_read(Car))
+            return {}
+
+        def get_response(request):
+            view = view_class.as_view()
+            middleware.process_view(request, view, (), {})
+            if asyncio.iscoroutinefunction(view):
+                view = async_to_sync(view)
+            response = view(request)
+            reads.append(self.router.db_for_read(Car))
+            return response
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        for view_class, method, fake in [
+            (views.CarListAPIView, "list", lambda *args, **kwargs: Response(read())),
+            (async_views.AsyncCarListView, "get_data", sync_to_async(read)),
+        ]:
+            with self.subTest(view=view_class.__name__):
+                cache.clear()
+                reads.clear()
+                with mock.patch.object(view_class, method, fake):
+                    middleware(RequestFactory().get("/api/cars/"))
+
+                # the miss reads the primary; the rest of the request may use a replica
+                self.assertEqual(reads, ["default", "replica1"])
+
+
+class PhoneNormalisationTests(TestCase):
+    def test_normalised_once(self):
+        car = Car.objects.create(name="Golf", price=Decimal("30.00"))
+        reservation = Reservation.objects.create(
+            car=car, name_surname="A", email="a@example.com", phone_number="+355 69 208 4705",
+            pickup_datetime=utc(2026, 6, 1, 10), return_datetime=utc(2026, 6, 3, 10),
+        )
+        self.assertEqual(reservation.phone_number, "+355692084705")
+
+        reservation = Reservation.objects.get(pk=reservation.pk)
+        with mock.patch.object(phones, "normalize", side_effect=AssertionError("re-validated")):
+            reservation.approve()
+
+        reservation.phone_number = "12"
+        with self.assertRaisesMessage(ValidationError, "Invalid phone number"):
+            reservation.save()
+
+    def test_import_budget(self):
+        """django.setup() stays fast and leaves phonenumbers unloaded until a number is checked."""
+        script = (
+            "import os, sys, time\n"
+            "os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'\n"
+            "started = time.perf_counter()\n"
+            "import django\n"
+            "django.setup()\n"
+            "print(time.perf_counter() - started, 'phonenumbers' in sys.modules)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.split()
+
+        self.assertEqual(output[1], "False")
+        self.assertLess(float(output[0]), IMPORT_BUDGET_SECONDS)
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            User.objects.create_superuser("admin", "admin@example.com", "password")
+        )
+        self.fleet = benchmarks.make_fleet(3, periods_per_car=1, images_per_car=1)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def test_constant_queries(self):
+        for url in ["/admin/cars/reservation/", "/admin/cars/carpriceperiod/", "/admin/cars/imgcarextra/"]:
+            with self.subTest(url=url):
+                Reservation.objects.all().delete()
+                benchmarks.make_reservations(self.fleet, 1)
+                few = self.changelist_queries(url)
+
+                benchmarks.make_reservations(self.fleet, 30, seed=2)
+                benchmarks.make_fleet(20, periods_per_car=1, images_per_car=1)
+                self.assertEqual(self.changelist_queries(url), few)
+
+    def test_date_hierarchy_and_substring_search(self):
+        benchmarks.make_reservations(self.fleet, 5)
+        Reservation.objects.filter(pk=Reservation.objects.first().pk).update(name_surname="Zana Hoxha")
+
+        response = self.client.get("/admin/cars/reservation/", {"pickup_datetime__year": 2024})
+        self.assertEqual(response.status_code, 200)
+
+        for query in ("zana", "hoxha"):
+            response = self.client.get("/admin/cars/reservation/", {"q": query})
+            self.assertEqual(response.context["cl"].result_count, 1, query)
@@ -0,0 +1,78 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Timings collected for one request by RequestTimingMiddleware."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.statements = Counter()
+        self.spans = {}
+        self._open = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook; sees queries even with DEBUG off
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def repeated_statement(self):
+        """The most repeated SQL statement and its count - the usual N+1 suspect."""
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+def current():
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def span(name):
+    """
+    Add the time spent in the block to the current request's `name` span.
+    Nested spans of the same name only count once; a no-op outside a
+    timed request.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics._open[name]:
+        yield
+        return
+
+    metrics._open[name] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._open[name] -= 1
+        elapsed = (time.perf_counter() - started) * 1000
+        metrics.spans[name] = metrics.spans.get(name, 0.0) + elapsed
+
+
+class TimedSerializerMixin:
+    """Count `to_representation` of a response serializer as serialization time."""
+
+    def to_representation(self, instance):
+        if _current.get() is None:
+            return super().to_representation(instance)
+        with span("serialize"):
+            return super().to_representation(instance)
@@ -1,10 +1,24 @@
 from django.urls import path
 from .views import *
+from . import async_views
 
 urlpatterns = [
     path('cars/', CarListAPIView.as_view(), name='cars'),
     path('reservations/', ReservationCreateAPIView.as_view()),
+    path('cars/available/', FleetAvailabilityAPIView.as_view(), name='cars-available'),
+    path('cars/availability/', CarAvailabilityAPIView.as_view(), name='car-availability'),
+    path('cars/calendar/', FleetCalendarAPIView.as_view(), name='fleet-calendar'),
     path('cars/<int:pk>/', CarDetailAPIView.as_view(), name='car-detail'),
+    path('cars/<int:pk>/calendar/', CarCalendarAPIView.as_view(), name='car-calendar'),
+    path('cars/<int:pk>/prices/', CarPriceCalendarAPIView.as_view(), name='car-prices'),
     path("car-extras/", CarExtraListAPIView.as_view(), name="car-extras"),
+    path("quotes/", QuoteAPIView.as_view(), name="quotes"),
     path("destination/", DestinationListAPIView.as_view(), name="destination"),
+
+    # native async read endpoints, for ASGI workers
+    path("async/cars/", async_views.AsyncCarListView.as_view(), name="async-cars"),
+    path("async/cars/availability/", async_views.AsyncCarAvailabilityView.as_view(), name="async-car-availability"),
+    path("async/cars/<int:pk>/", async_views.AsyncCarDetailView.as_view(), name="async-car-detail"),
+    path("async/car-extras/", async_views.AsyncCarExtraListView.as_view(), name="async-car-extras"),
+    path("async/destination/", async_views.AsyncDestinationListView.as_view(), name="async-destination"),
 ]
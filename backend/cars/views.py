@@ -1,59 +1,285 @@
 from django.shortcuts import render
-from rest_framework import generics
+from rest_framework import generics, serializers
 from .models import *
 from .serializers import *
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.core.exceptions import ValidationError as DjangoValidationError
+from .availability import approved_overlapping
+from . import catalog, extras, occupancy, pricing
+from .catalog import CatalogCacheMixin
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from .pagination import ReservationCursorPagination
 
 # Create your views here.
 
-class CarListAPIView(generics.ListAPIView):
+class CarListAPIView(CatalogCacheMixin, generics.ListAPIView):
+    # most queries a request may run, enforced by QueryBudgetTests and
+    # logged by RequestTimingMiddleware
+    query_budget = 4
+    # safe requests may read from a replica (cars.routers.ReplicaRouter)
+    use_replica = True
     serializer_class = CarSerializer
 
     def get_queryset(self):
-        # prefetch related extra images for efficiency
-        return Car.objects.prefetch_related(
-            "extra_images",
-            "price_periods"
-        ).order_by("id")
+        return Car.objects.order_by("id")
+
+    def list(self, request, *args, **kwargs):
+        # same JSON as CarSerializer, built from values() rows
+        cars = self.filter_queryset(self.get_queryset()).values(*catalog.CAR_FIELDS)
+        page = self.paginate_queryset(cars)
+        if page is None:
+            return Response(catalog.serialize_cars(list(cars), request))
+        return self.get_paginated_response(catalog.serialize_cars(page, request))
 
     def get_serializer_context(self):
         return {"request": self.request}
 
 class ReservationCreateAPIView(generics.ListCreateAPIView):
-    queryset = Reservation.objects.all()
+    # creating a booking, savepoints and outbox row included; listing takes 2
+    query_budget = 9
     serializer_class = ReservationSerializer
     parser_classes = (MultiPartParser, FormParser)
+    pagination_class = ReservationCursorPagination
+
+    def get_queryset(self):
+        # car and its price periods feed preview_days/preview_total_price
+        queryset = Reservation.objects.select_related("car").prefetch_related(
+            "car__price_periods"
+        )
+        if self.request.method != "GET":
+            return queryset
+
+        data = self.request.query_params.dict()
+        for param in ("from", "to"):
+            if param in data:
+                data[f"date_{param}"] = data.pop(param)
+
+        filters = ReservationFilterSerializer(data=data)
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        if "status" in params:
+            queryset = queryset.filter(status=params["status"])
+        if "car" in params:
+            queryset = queryset.filter(car_id=params["car"])
+        if "date_from" in params:
+            queryset = queryset.filter(return_datetime__gt=params["date_from"])
+        if "date_to" in params:
+            queryset = queryset.filter(pickup_datetime__lt=params["date_to"])
+
+        return queryset
 
 class CarAvailabilityAPIView(APIView):
+    query_budget = 1
+    use_replica = True
+
     def get(self, request):
-        car_id = request.query_params.get("car")
-        pickup = request.query_params.get("pickup")
-        return_dt = request.query_params.get("return")
-
-        is_available = not Reservation.objects.filter(
-            car_id=car_id,
-            status=Reservation.STATUS_APPROVED,
-            pickup_datetime__lt=return_dt,
-            return_datetime__gt=pickup,
+        params = CarAvailabilitySerializer.from_query(request.query_params)
+        params.is_valid(raise_exception=True)
+        search = params.validated_data
+
+        is_available = not approved_overlapping(search["pickup"], search["return_datetime"]).filter(
+            car_id=search["car"],
         ).exists()
 
         return Response({"available": is_available})
-    
-class CarDetailAPIView(generics.RetrieveAPIView):
+
+
+class FleetAvailabilityAPIView(APIView):
+    """Every car free between `pickup` and `return`, optionally filtered."""
+
+    query_budget = 3
+    use_replica = True
+
+    def get(self, request):
+        params = AvailabilitySearchSerializer.from_query(request.query_params)
+        params.is_valid(raise_exception=True)
+        search = params.validated_data
+
+        cars = Car.objects.order_by("id")
+
+        if "seats" in search:
+            cars = cars.filter(seats__gte=search["seats"])
+        if "transmission" in search:
+            cars = cars.filter(transmission=search["transmission"])
+        if "fuel_type" in search:
+            cars = cars.filter(fuel_type__iexact=search["fuel_type"])
+
+        # one query: the overlap subquery is answered from reservation_window_idx
+        busy = approved_overlapping(search["pickup"], search["return_datetime"]).values("car_id")
+        free = list(cars.exclude(pk__in=busy).values(*catalog.CAR_FIELDS))
+        return Response(catalog.serialize_cars(free, request))
+
+class CarDetailAPIView(CatalogCacheMixin, generics.RetrieveAPIView):
+    query_budget = 3
+    use_replica = True
     serializer_class = CarSerializer
 
     def get_queryset(self):
-        return Car.objects.prefetch_related("extra_images")
+        return Car.objects.prefetch_related("extra_images", "price_periods")
 
     def get_serializer_context(self):
         return {"request": self.request}
 
 class CarExtraListAPIView(generics.ListAPIView):
-    queryset = CarExtra.objects.all().order_by("id")
+    query_budget = 1
     serializer_class = CarExtraSerializer
 
+    def get_queryset(self):
+        return extras.all_extras()
+
 class DestinationListAPIView(generics.ListAPIView):
+    query_budget = 2
     queryset = Destination.objects.all()
-    serializer_class = DestinationSerializer
\ No newline at end of file
+    serializer_class = DestinationSerializer
+
+
+class QuoteAPIView(APIView):
+    """
+    Price many (car, pickup, return, extras) tuples in one request.
+
+    Cars with their price periods and the requested extras are loaded up
+    front, so the query count does not depend on the number of quotes.
+    """
+    query_budget = 3
+    max_quotes = 200
+
+    def post(self, request):
+        items = request.data.get("quotes") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or len(items) > self.max_quotes:
+            raise serializers.ValidationError(
+                {"quotes": f"Expected a list of at most {self.max_quotes} quotes."}
+            )
+
+        serializer = QuoteRequestSerializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        wanted = serializer.validated_data
+
+        cars = Car.objects.prefetch_related("price_periods").in_bulk(
+            {item["car"] for item in wanted}
+        )
+        known_extras = extras.get_extras(
+            {extra_id for item in wanted for extra_id in item["extras"]}
+        )
+
+        quotes = []
+        for item in wanted:
+            chosen = [known_extras[extra_id] for extra_id in item["extras"] if extra_id in known_extras]
+            quote = {
+                **item,
+                "extras": chosen,
+                "total_days": None,
+                "car_price_total": None,
+                "total_price": None,
+                "error": None,
+            }
+
+            car = cars.get(item["car"])
+            if car is None:
+                quote["error"] = "Car not found."
+            else:
+                try:
+                    days, car_total, total = pricing.quote(
+                        car,
+                        car.price_periods.all(),
+                        item["pickup_datetime"],
+                        item["return_datetime"],
+                        [{"price": extra.price} for extra in chosen],
+                    )
+                except DjangoValidationError as exc:
+                    quote["error"] = exc.messages[0]
+                else:
+                    quote.update(total_days=days, car_price_total=car_total, total_price=total)
+
+            quotes.append(quote)
+
+        return Response(QuoteSerializer(quotes, many=True).data)
+
+
+def requested_month(request):
+    value = request.query_params.get("month")
+    if not value:
+        return occupancy.current_month()
+    try:
+        return occupancy.parse_month(value)
+    except ValueError:
+        raise serializers.ValidationError({"month": "Expected YYYY-MM."})
+
+
+class CarCalendarAPIView(APIView):
+    """Booked days of one car for ?month=YYYY-MM, read from its occupancy bitmap."""
+
+    query_budget = 1
+    use_replica = True
+
+    def get(self, request, pk):
+        month = requested_month(request)
+        mask = occupancy.car_month(pk, month)
+        return Response({
+            "car": pk,
+            "month": f"{month:%Y-%m}",
+            "bitmap": mask,
+            "occupied_days": occupancy.mask_days(mask),
+        })
+
+
+class FleetCalendarAPIView(APIView):
+    """Booked days of every car for ?month=YYYY-MM."""
+
+    query_budget = 2
+    use_replica = True
+
+    def get(self, request):
+        month = requested_month(request)
+        masks = occupancy.fleet_month(month)
+        return Response({
+            "month": f"{month:%Y-%m}",
+            "cars": [
+                {
+                    "car": car_id,
+                    "bitmap": masks.get(car_id, 0),
+                    "occupied_days": occupancy.mask_days(masks.get(car_id, 0)),
+                }
+                for car_id in Car.objects.order_by("id").values_list("id", flat=True)
+            ],
+        })
+
+
+class CarPriceCalendarAPIView(APIView):
+    """
+    Effective daily rate of a car for ?from=YYYY-MM-DD&to=YYYY-MM-DD
+    (inclusive), cached per catalog version.
+    """
+
+    query_budget = 2
+    use_replica = True
+
+    def get(self, request, pk):
+        data = request.query_params.dict()
+        for param in ("from", "to"):
+            if param in data:
+                data[f"date_{param}"] = data.pop(param)
+
+        params = PriceCalendarQuerySerializer(data=data)
+        params.is_valid(raise_exception=True)
+        start, end = params.validated_data["date_from"], params.validated_data["date_to"]
+
+        key = catalog.cache_key("prices", pk, start, end)
+        body = cache.get(key)
+        if body is None:
+            car = get_object_or_404(Car.objects.prefetch_related("price_periods"), pk=pk)
+            prices = pricing.daily_prices(car, car.price_periods.all(), start, (end - start).days + 1)
+            body = {
+                "car": car.pk,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "days": DailyPriceSerializer(
+                    [{"date": day, "price": price} for day, price in prices], many=True
+                ).data,
+            }
+            cache.set(key, body, catalog.cache_timeout())
+
+        return Response(body)
@@ -0,0 +1,13 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend whose transactions take the write lock when they begin
+    (Django 5.1's transaction_mode="IMMEDIATE"). A deferred transaction that
+    reads before writing fails with "database is locked" instead of waiting
+    for busy_timeout when another connection is writing.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")